@@ -0,0 +1,129 @@
+import argparse
+import csv
+import json
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from rate_limit import TokenBucket
+from prompts import get_mode
+from translator import generate
+
+BATCH_PARALLELISM = int(os.environ.get("BATCH_PARALLELISM", 4))
+BATCH_RATE = float(os.environ.get("BATCH_RATE", 2))
+CHECKPOINT_EVERY = int(os.environ.get("BATCH_CHECKPOINT_EVERY", 50))
+
+def read_rows(source, input_format):
+    if input_format == "csv":
+        for row in csv.DictReader(source):
+            yield row
+    else:
+        for line in source:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+def detect_format(path):
+    return "csv" if path.lower().endswith(".csv") else "jsonl"
+
+def translate_row(row, default_mode, bucket, use_cache):
+    text = row.get("text") or ""
+    mode = row.get("mode")
+    if mode in (None, ""):
+        mode = default_mode
+    result = {"id": row.get("id"), "mode": mode, "input": text}
+
+    if bucket is not None:
+        bucket.acquire()
+    try:
+        result["mode"] = get_mode(mode).name
+        result["output"] = generate(text, mode, use_cache=use_cache)
+    except Exception as e:
+        result["error"] = str(e)
+    return result
+
+def translate_batch(rows, default_mode="real", parallelism=BATCH_PARALLELISM, rate=BATCH_RATE, use_cache=True):
+    # 0 (or less) means no rate limit; parallelism still bounds the calls in flight
+    bucket = TokenBucket(rate, capacity=parallelism) if rate > 0 else None
+    window = parallelism * 4
+    in_flight = []
+
+    with ThreadPoolExecutor(max_workers=parallelism) as executor:
+        for row in rows:
+            in_flight.append(executor.submit(translate_row, row, default_mode, bucket, use_cache))
+            if len(in_flight) >= window:
+                yield in_flight.pop(0).result()
+
+        for future in in_flight:
+            yield future.result()
+
+def load_checkpoint(path):
+    if not path or not os.path.exists(path):
+        return 0, None
+    with open(path) as f:
+        checkpoint = json.load(f)
+    return checkpoint.get("completed", 0), checkpoint.get("offset")
+
+def save_checkpoint(path, completed, offset):
+    if not path:
+        return
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({"completed": completed, "offset": offset}, f)
+    os.replace(tmp_path, path)
+
+def open_output(path, completed, offset):
+    if path == "-":
+        return sys.stdout
+    if not completed:
+        return open(path, "w", encoding="utf-8")
+    # Rows written after the last checkpoint (or cut off mid-line) are translated again, so drop them
+    if offset is not None and os.path.exists(path):
+        os.truncate(path, offset)
+    return open(path, "a", encoding="utf-8")
+
+def record_progress(path, output, completed):
+    output.flush()
+    offset = None if output is sys.stdout else output.tell()
+    save_checkpoint(path, completed, offset)
+
+def skip_rows(rows, count):
+    for i, row in enumerate(rows):
+        if i >= count:
+            yield row
+
+def main():
+    parser = argparse.ArgumentParser(description="Translate a JSONL or CSV file of messages (one per row, with a 'text' column and an optional 'mode')")
+    parser.add_argument("input", nargs="?", default="-", help="input file, or - for stdin")
+    parser.add_argument("-o", "--output", default="-", help="output JSONL file, or - for stdout")
+    parser.add_argument("--format", choices=["jsonl", "csv"], help="input format (defaults to the file extension, jsonl for stdin)")
+    parser.add_argument("--mode", default="real", help="mode for rows without one (corporate, casual, real, email or 0-3)")
+    parser.add_argument("--parallelism", type=int, default=BATCH_PARALLELISM)
+    parser.add_argument("--rate", type=float, default=BATCH_RATE, help="maximum requests per second, 0 for no limit")
+    parser.add_argument("--checkpoint", help="file recording progress so an interrupted run can resume")
+    parser.add_argument("--no-cache", action="store_true", help="always call the model, even for repeated rows")
+    args = parser.parse_args()
+
+    input_format = args.format or ("jsonl" if args.input == "-" else detect_format(args.input))
+    source = sys.stdin if args.input == "-" else open(args.input, newline="", encoding="utf-8")
+
+    completed, offset = load_checkpoint(args.checkpoint)
+    if completed:
+        print(f"Resuming after {completed} rows", file=sys.stderr)
+    output = open_output(args.output, completed, offset)
+
+    rows = skip_rows(read_rows(source, input_format), completed)
+    try:
+        for result in translate_batch(rows, args.mode, args.parallelism, args.rate, use_cache=not args.no_cache):
+            output.write(json.dumps(result, ensure_ascii=False) + "\n")
+            completed += 1
+            if completed % CHECKPOINT_EVERY == 0:
+                record_progress(args.checkpoint, output, completed)
+    finally:
+        record_progress(args.checkpoint, output, completed)
+        if output is not sys.stdout:
+            output.close()
+        if source is not sys.stdin:
+            source.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from blocks import MessageView, fallback_text, SECTION_TEXT_LIMIT, MESSAGE_BLOCK_LIMIT
+from streaming import STREAM_UPDATE_CHARS
+
+# Header, input label and modes for each command, as the handlers render them
+COMMANDS = {
+    "/tellboss": ("📢 Message for Your Boss 😁", "Your Message", ["corporate"]),
+    "/tldr": ("📢 Message from Your Boss 😡", "Boss's Message", ["casual"]),
+    "/befr": ("🙄 What your boss actually means", "Boss's Message", ["real"]),
+    "email": ("📧 Email  Generated", "Original Message", ["email"]),
+    "/decode": ("📢 Your boss, fully decoded 🔍", "Boss's Message", ["casual", "real"]),
+    "/decode --all": ("📢 Your boss, fully decoded 🔍", "Boss's Message", ["corporate", "casual", "real"])
+}
+WORDS = "we need to align on strategic priorities and leverage our synergies going forward to unlock value for key stakeholders".split()
+
+def sample_text(chars, rng):
+    lines = []
+    line = []
+    length = 0
+    while length < chars:
+        word = rng.choice(WORDS)
+        line.append(word)
+        length += len(word) + 1
+        if len(line) >= rng.randint(12, 30):
+            lines.append(" ".join(line))
+            line = []
+    lines.append(" ".join(line))
+    return "\n".join(lines)[:chars]
+
+def render_request(command, user_message, response):
+    # Every payload one request sends: the placeholder, each streamed update and the final message
+    header_text, input_description, modes = COMMANDS[command]
+    view = MessageView(header_text, user_message, input_description, "U0BENCH", False)
+    payloads = [(view.loading("job-bench"), "Generating response to your annoying boss... 👊")]
+
+    if len(modes) > 1:
+        responses = {mode: response for mode in modes}
+        job_ids = {mode: f"job-{mode}" for mode in modes}
+        payloads.append((view.multi_final(responses, job_ids), fallback_text("Decoded: ", " | ".join(responses.values()))))
+        return payloads
+
+    for end in range(STREAM_UPDATE_CHARS, len(response), STREAM_UPDATE_CHARS):
+        partial = response[:end]
+        payloads.append((view.streaming(partial, "job-bench"), fallback_text("Generating response: ", partial)))
+    payloads.append((view.final(response, modes[0], "job-bench", 0), fallback_text("Generated response: ", response)))
+    return payloads
+
+def violations(blocks):
+    found = 0
+    if len(blocks) > MESSAGE_BLOCK_LIMIT:
+        found += 1
+    for block in blocks:
+        if block["type"] == "section" and len(block["text"]["text"]) > SECTION_TEXT_LIMIT:
+            found += 1
+    return found
+
+def measure(command, user_message, response, iterations):
+    timings = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        render_request(command, user_message, response)
+        timings.append(time.perf_counter() - started)
+
+    payloads = render_request(command, user_message, response)
+    sizes = [len(json.dumps({"blocks": blocks, "text": text}, ensure_ascii=False).encode("utf-8")) for blocks, text in payloads]
+    return {
+        "payloads": len(payloads),
+        "render_us_per_request": round(statistics.median(timings) * 1e6, 1),
+        "bytes_per_request": sum(sizes),
+        "largest_payload_bytes": max(sizes),
+        "most_blocks": max(len(blocks) for blocks, text in payloads),
+        "limit_violations": sum(violations(blocks) for blocks, text in payloads)
+    }
+
+def run(args):
+    rng = random.Random(args.seed)
+    response = sample_text(args.response_chars, rng)
+    inputs = {name: sample_text(chars, rng) for name, chars in (("short", args.short_chars), ("long", args.long_chars), ("oversize", args.oversize_chars))}
+
+    results = {}
+    for command in COMMANDS:
+        results[command] = {size: measure(command, text, response, args.iterations) for size, text in inputs.items()}
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Time Block Kit rendering and measure payload sizes per command, for short, long and oversize inputs")
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--short-chars", type=int, default=120)
+    parser.add_argument("--long-chars", type=int, default=2800)
+    parser.add_argument("--oversize-chars", type=int, default=20000, help="e.g. a long thread pulled in through a message link")
+    parser.add_argument("--response-chars", type=int, default=900)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    args = parser.parse_args()
+
+    results = run(args)
+    for command, sizes in results.items():
+        for size, result in sizes.items():
+            print(f"{command:>14} {size:>8}: {result['payloads']} payloads | {result['render_us_per_request']:>7}us | {result['bytes_per_request']:>7} bytes (largest {result['largest_payload_bytes']}) | {result['most_blocks']} blocks | {result['limit_violations']} over Slack limits")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({
+                "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "python": platform.python_version(),
+                "config": vars(args),
+                "results": results
+            }, f, indent=2)
+
+if __name__ == "__main__":
+    main()
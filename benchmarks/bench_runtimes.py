@@ -0,0 +1,139 @@
+import argparse
+import asyncio
+import hashlib
+import hmac
+import importlib
+import os
+import statistics
+import sys
+import time
+from urllib.parse import urlencode
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fake_servers import FakeSlackServer, FakeGeminiServer
+
+SIGNING_SECRET = "bench-signing-secret"
+
+def configure_env(slack, gemini):
+    os.environ["SLACK_BOT_TOKEN"] = "xoxb-bench"
+    os.environ["SLACK_SIGNING_SECRET"] = SIGNING_SECRET
+    os.environ["SLACK_API_URL"] = slack.url
+    os.environ["GEMINI_API_KEY"] = "bench-key"
+    os.environ["GEMINI_BASE_URL"] = gemini.url
+    os.environ.setdefault("MAX_JOBS_PER_WORKSPACE", "1000")
+    # Every benchmark request comes from one workspace; per-user and per-channel quotas still apply
+    os.environ.setdefault("QUOTA_WORKSPACE_REQUESTS", "0")
+    os.environ.setdefault("QUOTA_WORKSPACE_TOKENS", "0")
+    os.environ.setdefault("QUOTA_USAGE_DB", "")
+    # The fake Slack server has no rate limits to respect, pacing would only measure the limiter
+    os.environ.setdefault("SLACK_RATE_LIMIT_SCALE", "0")
+
+def slash_command_request(slack, index, command="/befr", channel_id=None, user_id=None, text=None):
+    channel_id = channel_id or f"CBENCH{index}"
+    body = urlencode({
+        "command": command,
+        "text": text or f"We must leverage synergies to unlock value, round {index}.",
+        "channel_id": channel_id,
+        "user_id": user_id or f"U{index}",
+        "team_id": "TBENCH",
+        "response_url": slack.url + f"response.{channel_id}",
+        "trigger_id": f"trigger-{index}"
+    })
+    timestamp = str(int(time.time()))
+    base = f"v0:{timestamp}:{body}".encode("utf-8")
+    signature = "v0=" + hmac.new(SIGNING_SECRET.encode("utf-8"), base, hashlib.sha256).hexdigest()
+    headers = {
+        "content-type": ["application/x-www-form-urlencoded"],
+        "x-slack-request-timestamp": [timestamp],
+        "x-slack-signature": [signature]
+    }
+    return body, headers
+
+def wait_for_finals(slack, channels, started, timeout):
+    deadline = time.monotonic() + timeout
+    finished = {}
+
+    while time.monotonic() < deadline and len(finished) < len(channels):
+        for at, method, params in slack.calls_for("chat.update"):
+            channel = params.get("channel")
+            if channel in channels and channel not in finished and str(params.get("text", "")).startswith("Generated response"):
+                finished[channel] = at - started[channel]
+        time.sleep(0.01)
+
+    return finished
+
+def summarize(name, latencies, requests, elapsed):
+    ordered = sorted(latencies)
+    return {
+        "runtime": name,
+        "requests": requests,
+        "completed": len(ordered),
+        "elapsed": round(elapsed, 3),
+        "throughput": round(len(ordered) / elapsed, 2) if elapsed else 0,
+        "p50": round(statistics.median(ordered), 3) if ordered else None,
+        "p95": round(ordered[int(len(ordered) * 0.95) - 1], 3) if ordered else None,
+        "max": round(ordered[-1], 3) if ordered else None
+    }
+
+def bench_sync(slack, requests, timeout):
+    from slack_bolt.request import BoltRequest
+    bot = importlib.import_module("slack_local_bot")
+
+    started = {}
+    begin = time.monotonic()
+    for i in range(requests):
+        body, headers = slash_command_request(slack, i)
+        started[f"CBENCH{i}"] = time.monotonic()
+        bot.app.dispatch(BoltRequest(body=body, headers=headers))
+
+    finished = wait_for_finals(slack, set(started), started, timeout)
+    return summarize("sync", list(finished.values()), requests, time.monotonic() - begin)
+
+def bench_async(slack, requests, timeout):
+    from slack_bolt.request.async_request import AsyncBoltRequest
+    bot = importlib.import_module("slack_async_bot")
+    offset = requests
+
+    async def run():
+        started = {}
+        begin = time.monotonic()
+        for i in range(offset, offset + requests):
+            body, headers = slash_command_request(slack, i)
+            started[f"CBENCH{i}"] = time.monotonic()
+            await bot.app.async_dispatch(AsyncBoltRequest(body=body, headers=headers))
+
+        finished = await asyncio.to_thread(wait_for_finals, slack, set(started), started, timeout)
+        await bot.app.client.close()
+        return summarize("async", list(finished.values()), requests, time.monotonic() - begin)
+
+    return asyncio.run(run())
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the sync and async bot runtimes against local fake Slack and Gemini servers")
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--slack-latency", type=float, default=0.02)
+    parser.add_argument("--gemini-latency", type=float, default=0.3)
+    parser.add_argument("--chunk-delay", type=float, default=0.05)
+    parser.add_argument("--timeout", type=float, default=120)
+    parser.add_argument("--runtime", choices=["sync", "async", "both"], default="both")
+    args = parser.parse_args()
+
+    slack = FakeSlackServer(latency=args.slack_latency).start()
+    gemini = FakeGeminiServer(latency=args.gemini_latency, chunk_delay=args.chunk_delay).start()
+    configure_env(slack, gemini)
+    # The bots import the Gemini SDK lazily; benchmarks/cold_start.py measures that part
+    from gemini_client import warm_imports
+    warm_imports()
+
+    results = []
+    if args.runtime in ("sync", "both"):
+        results.append(bench_sync(slack, args.requests, args.timeout))
+    if args.runtime in ("async", "both"):
+        results.append(bench_async(slack, args.requests, args.timeout))
+
+    for result in results:
+        print(f"{result['runtime']:>5}: {result['completed']}/{result['requests']} done in {result['elapsed']}s | {result['throughput']} req/s | p50 {result['p50']}s | p95 {result['p95']}s | max {result['max']}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+import argparse
+import json
+import os
+import platform
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from collections import Counter
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.fake_servers import FakeSlackServer, FakeGeminiServer
+from benchmarks.bench_runtimes import configure_env, slash_command_request
+
+SLACK_ACK_DEADLINE = 3.0
+MODES = {"default": "false", "fast": "true"}
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def bot_env(fast_start):
+    return dict(os.environ, FAST_START=fast_start)
+
+def import_profile(module, env, top):
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"], cwd=ROOT, env=env, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise Exception(f"Importing {module} failed: {result.stderr.strip().splitlines()[-1]}")
+
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((name.strip(), int(self_us), int(cumulative_us)))
+
+    packages = Counter()
+    for name, self_us, cumulative_us in rows:
+        packages[name.split(".")[0]] += self_us
+
+    # The module's own self time includes building App, so a startup auth.test shows up here
+    total, own = next((cumulative_us, self_us) for name, self_us, cumulative_us in reversed(rows) if name == module)
+    return {
+        "module": module,
+        "seconds": round(total / 1e6, 3),
+        "module_body_seconds": round(own / 1e6, 3),
+        "modules_imported": len(rows),
+        "gemini_sdk_imported": any(name == "google.genai" for name, self_us, cumulative_us in rows),
+        "top_packages": [{"package": package, "seconds": round(us / 1e6, 3)} for package, us in packages.most_common(top)]
+    }
+
+def cold_request(slack, env, index, timeout):
+    port = free_port()
+    url = f"http://127.0.0.1:{port}/slack/events"
+    channel = f"CCOLD{index}"
+    body, headers = slash_command_request(slack, index, "/tldr", channel)
+    request = urllib.request.Request(url, data=body.encode("utf-8"), headers={key: values[0] for key, values in headers.items()})
+
+    started = time.monotonic()
+    process = subprocess.Popen([sys.executable, "slack_bot.py"], cwd=ROOT, env=dict(env, PORT=str(port)), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        while True:
+            if time.monotonic() - started > timeout:
+                raise Exception(f"slack_bot.py did not answer within {timeout}s")
+            sent = time.monotonic()
+            try:
+                with urllib.request.urlopen(request, timeout=timeout) as response:
+                    status = response.status
+                break
+            except urllib.error.HTTPError as e:
+                status = e.code
+                break
+            except (urllib.error.URLError, ConnectionError):
+                time.sleep(0.005)
+        acked = time.monotonic()
+
+        answered = None
+        while answered is None and time.monotonic() - started < timeout:
+            for at, method, params in slack.calls_for("chat.update"):
+                if params.get("channel") == channel and str(params.get("text", "")).startswith("Generated response"):
+                    answered = at
+            time.sleep(0.01)
+    finally:
+        process.terminate()
+        process.wait()
+
+    return {
+        "status": status,
+        "listening": sent - started,
+        "ack": acked - started,
+        "request_ack": acked - sent,
+        "first_response": answered - started if answered else None
+    }
+
+def median(runs, key):
+    values = [run[key] for run in runs if run[key] is not None]
+    return round(statistics.median(values), 3) if values else None
+
+def run(args):
+    slack = FakeSlackServer(latency=args.slack_latency).start()
+    gemini = FakeGeminiServer(latency=args.gemini_latency, chunk_delay=args.chunk_delay).start()
+    configure_env(slack, gemini)
+    os.environ["TRANSLATOR_CACHE_SIZE"] = "0"
+
+    modes = list(MODES) if args.mode == "both" else [args.mode]
+    results = {}
+    index = 0
+    for mode in modes:
+        env = bot_env(MODES[mode])
+        runs = []
+        for i in range(args.runs):
+            runs.append(cold_request(slack, env, index, args.timeout))
+            index += 1
+
+        ack = median(runs, "ack")
+        results[mode] = {
+            "import": import_profile("slack_bot", env, args.top),
+            "runs": args.runs,
+            "listening_seconds": median(runs, "listening"),
+            "first_ack_seconds": ack,
+            "first_request_ack_seconds": median(runs, "request_ack"),
+            "first_response_seconds": median(runs, "first_response"),
+            "within_ack_deadline": ack is not None and ack < SLACK_ACK_DEADLINE,
+            "statuses": sorted({run["status"] for run in runs})
+        }
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Profile slack_bot.py imports and time a cold process from spawn to its first Slack ack, against local fake Slack and Gemini servers")
+    parser.add_argument("--mode", choices=list(MODES) + ["both"], default="both", help="default: FAST_START=false, fast: FAST_START=true")
+    parser.add_argument("--runs", type=int, default=3, help="cold starts per mode, medians are reported")
+    parser.add_argument("--top", type=int, default=10, help="packages to list by import time")
+    parser.add_argument("--timeout", type=float, default=30)
+    parser.add_argument("--slack-latency", type=float, default=0.05, help="also applies to the auth.test call made at startup")
+    parser.add_argument("--gemini-latency", type=float, default=0.3)
+    parser.add_argument("--chunk-delay", type=float, default=0.05)
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    args = parser.parse_args()
+
+    results = run(args)
+    print(json.dumps(results, indent=2))
+    for mode, result in results.items():
+        print(f"{mode:>7}: import {result['import']['seconds']}s | listening {result['listening_seconds']}s | first ack {result['first_ack_seconds']}s | first response {result['first_response_seconds']}s | within {SLACK_ACK_DEADLINE}s: {result['within_ack_deadline']}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({
+                "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "python": platform.python_version(),
+                "config": vars(args),
+                "results": results
+            }, f, indent=2)
+
+    os._exit(0)
+
+if __name__ == "__main__":
+    main()
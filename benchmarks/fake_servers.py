@@ -0,0 +1,206 @@
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+class FakeSlackHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out in separate writes; on a kept-alive connection Nagle would hold the body for the client's delayed ACK
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        server = self.server
+        method = self.path.rstrip("/").split("/")[-1]
+        length = int(self.headers.get("Content-Length", 0))
+        raw = self.rfile.read(length).decode("utf-8") if length else ""
+
+        if self.headers.get("Content-Type", "").startswith("application/json"):
+            params = json.loads(raw) if raw else {}
+        else:
+            params = {key: values[0] for key, values in parse_qs(raw).items()}
+
+        server.delay()
+
+        if server.should_rate_limit(method):
+            status, body = 429, {"ok": False, "error": "ratelimited"}
+            server.record(method, params, rate_limited=True)
+        elif server.should_fail(method):
+            status, body = 500, {"ok": False, "error": "fatal_error"}
+            server.record(method, params, failed=True)
+        else:
+            status, body = 200, server.respond(method, params)
+            server.record(method, params)
+
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        if status == 429:
+            self.send_header("Retry-After", str(server.retry_after))
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+class FakeSlackServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024
+
+    def __init__(self, latency=0.0, port=0, jitter=0.0, error_rate=0.0, seed=None, rate_limit_rate=0.0, retry_after=0):
+        super().__init__(("127.0.0.1", port), FakeSlackHandler)
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+        self.random = random.Random(seed)
+        self.calls = []
+        self.failures = []
+        self.rate_limited = []
+        self.lock = threading.Lock()
+        self.ts_counter = 0
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}/api/"
+
+    def delay(self):
+        with self.lock:
+            seconds = self.latency + (self.random.uniform(0, self.jitter) if self.jitter else 0)
+        if seconds:
+            time.sleep(seconds)
+
+    def should_fail(self, method):
+        if not self.error_rate or method == "auth.test":
+            return False
+        with self.lock:
+            return self.random.random() < self.error_rate
+
+    def should_rate_limit(self, method):
+        if not self.rate_limit_rate or method == "auth.test":
+            return False
+        with self.lock:
+            return self.random.random() < self.rate_limit_rate
+
+    def next_ts(self):
+        with self.lock:
+            self.ts_counter += 1
+            return f"1700000000.{self.ts_counter:06d}"
+
+    def respond(self, method, params):
+        if method == "auth.test":
+            return {"ok": True, "user_id": "UBOT", "bot_id": "BBOT", "team_id": "TBENCH", "user": "bot", "team": "bench"}
+        if method == "chat.postMessage":
+            return {"ok": True, "channel": params.get("channel"), "ts": self.next_ts()}
+        if method == "chat.update":
+            return {"ok": True, "channel": params.get("channel"), "ts": params.get("ts")}
+        if method == "conversations.history":
+            return {"ok": True, "messages": [{"ts": params.get("latest", self.next_ts()), "text": "We must leverage our synergies."}], "has_more": False}
+        if method == "conversations.replies":
+            # Like Slack, the thread parent comes first
+            return {"ok": True, "messages": [{"ts": params.get("ts"), "text": "Quick question about Q3."}, {"ts": params.get("latest", self.next_ts()), "text": "Per my last message, we must leverage our synergies."}], "has_more": False}
+        return {"ok": True}
+
+    def record(self, method, params, failed=False, rate_limited=False):
+        with self.lock:
+            (self.rate_limited if rate_limited else self.failures if failed else self.calls).append((time.monotonic(), method, params))
+
+    def calls_for(self, method):
+        with self.lock:
+            return [call for call in self.calls if call[1] == method]
+
+    def calls_like(self, prefix):
+        with self.lock:
+            return [call for call in self.calls if call[1].startswith(prefix)]
+
+    def start(self):
+        thread = threading.Thread(target=self.serve_forever, daemon=True)
+        thread.start()
+        return self
+
+class FakeGeminiHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        server = self.server
+        length = int(self.headers.get("Content-Length", 0))
+        self.rfile.read(length)
+        server.record()
+        server.delay()
+
+        if server.should_fail():
+            payload = json.dumps({"error": {"code": 503, "message": "The model is overloaded.", "status": "UNAVAILABLE"}}).encode("utf-8")
+            self.send_response(503)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        for i, text in enumerate(server.chunks):
+            if server.chunk_delay:
+                time.sleep(server.chunk_delay)
+            event = {"candidates": [{"content": {"role": "model", "parts": [{"text": text}]}}]}
+            if i == len(server.chunks) - 1:
+                event["usageMetadata"] = {"promptTokenCount": length // 4, "candidatesTokenCount": len("".join(server.chunks)) // 4}
+            self.write_chunk(f"data: {json.dumps(event)}\r\n\r\n".encode("utf-8"))
+        self.write_chunk(b"")
+
+    def write_chunk(self, data):
+        self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+        self.wfile.flush()
+
+class FakeGeminiServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024
+
+    def __init__(self, latency=0.0, chunk_delay=0.0, chunks=None, port=0, jitter=0.0, error_rate=0.0, seed=None):
+        super().__init__(("127.0.0.1", port), FakeGeminiHandler)
+        self.latency = latency
+        self.chunk_delay = chunk_delay
+        self.chunks = chunks or ["We need ", "to make ", "more money. ", "Work harder."]
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self.requests = 0
+        self.failures = 0
+        self.lock = threading.Lock()
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}/"
+
+    def record(self):
+        with self.lock:
+            self.requests += 1
+
+    def delay(self):
+        with self.lock:
+            seconds = self.latency + (self.random.uniform(0, self.jitter) if self.jitter else 0)
+        if seconds:
+            time.sleep(seconds)
+
+    def should_fail(self):
+        if not self.error_rate:
+            return False
+        with self.lock:
+            failed = self.random.random() < self.error_rate
+            if failed:
+                self.failures += 1
+            return failed
+
+    def start(self):
+        thread = threading.Thread(target=self.serve_forever, daemon=True)
+        thread.start()
+        return self
@@ -0,0 +1,304 @@
+import argparse
+import asyncio
+import importlib
+import json
+import os
+import platform
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fake_servers import FakeSlackServer, FakeGeminiServer
+from benchmarks.bench_runtimes import configure_env, slash_command_request
+
+TARGETS = ("flask", "socket", "async")
+ABUSER = "UABUSER"
+
+def percentile(ordered, fraction):
+    if not ordered:
+        return None
+    return round(ordered[min(len(ordered) - 1, int(len(ordered) * fraction))], 4)
+
+def latency_summary(values):
+    ordered = sorted(values)
+    return {
+        "count": len(ordered),
+        "p50": percentile(ordered, 0.5),
+        "p95": percentile(ordered, 0.95),
+        "p99": percentile(ordered, 0.99),
+        "max": round(ordered[-1], 4) if ordered else None
+    }
+
+def channel_for(index):
+    return f"CLOAD{index}"
+
+class FlaskTarget:
+    def __init__(self, concurrency):
+        import httpx
+        from werkzeug.serving import make_server, WSGIRequestHandler
+
+        class QuietHandler(WSGIRequestHandler):
+            def log_request(self, *args, **kwargs):
+                pass
+
+        bot = importlib.import_module("slack_bot")
+        self.server = make_server("127.0.0.1", 0, bot.flask_app, threaded=True, request_handler=QuietHandler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = f"http://127.0.0.1:{self.server.server_port}/slack/events"
+        self.client = httpx.Client(limits=httpx.Limits(max_connections=concurrency), timeout=30)
+
+    def send(self, body, headers):
+        response = self.client.post(self.url, content=body, headers={key: values[0] for key, values in headers.items()})
+        return response.status_code
+
+    def close(self):
+        self.server.shutdown()
+        self.client.close()
+
+class SocketTarget:
+    # Socket Mode hands each envelope to App.dispatch; calling it directly skips only the websocket hop.
+    def __init__(self, concurrency):
+        from slack_bolt.request import BoltRequest
+
+        self.request_class = BoltRequest
+        self.bot = importlib.import_module("slack_local_bot")
+
+    def send(self, body, headers):
+        return self.bot.app.dispatch(self.request_class(body=body, headers=headers, mode="socket_mode")).status
+
+    def close(self):
+        pass
+
+class AsyncTarget:
+    def __init__(self, concurrency):
+        from slack_bolt.request.async_request import AsyncBoltRequest
+
+        self.request_class = AsyncBoltRequest
+        self.bot = importlib.import_module("slack_async_bot")
+        self.loop = asyncio.new_event_loop()
+        threading.Thread(target=self.loop.run_forever, daemon=True).start()
+
+    def send(self, body, headers):
+        future = asyncio.run_coroutine_threadsafe(self.bot.app.async_dispatch(self.request_class(body=body, headers=headers, mode="socket_mode")), self.loop)
+        return future.result().status
+
+    def close(self):
+        self.loop.call_soon_threadsafe(self.loop.stop)
+
+def build_target(name, concurrency):
+    if name == "flask":
+        return FlaskTarget(concurrency)
+    if name == "socket":
+        return SocketTarget(concurrency)
+    return AsyncTarget(concurrency)
+
+def collect_outcomes(slack, sent, timeout):
+    deadline = time.monotonic() + timeout
+    outcomes = {}
+
+    while time.monotonic() < deadline and len(outcomes) < len(sent):
+        for at, method, params in slack.calls_for("chat.update"):
+            channel = params.get("channel")
+            if channel not in sent or channel in outcomes:
+                continue
+            text = str(params.get("text", ""))
+            if text.startswith("Generated response"):
+                outcomes[channel] = ("ok", at - sent[channel])
+            elif not text.startswith("Generating response"):
+                outcomes[channel] = ("failed", at - sent[channel])
+        for at, method, params in slack.calls_like("response."):
+            channel = method.split(".", 1)[1]
+            if channel not in sent or channel in outcomes:
+                continue
+            text = str(params.get("text", ""))
+            if "swamped" in text:
+                outcomes[channel] = ("rejected", at - sent[channel])
+            elif text.startswith("🐢"):
+                outcomes[channel] = ("throttled", at - sent[channel])
+        time.sleep(0.02)
+
+    return outcomes
+
+def run(args):
+    slack = FakeSlackServer(latency=args.slack_latency, jitter=args.slack_jitter, error_rate=args.slack_error_rate, seed=args.seed, rate_limit_rate=args.slack_rate_limit_rate).start()
+    gemini = FakeGeminiServer(latency=args.gemini_latency, chunk_delay=args.chunk_delay, jitter=args.gemini_jitter, error_rate=args.gemini_error_rate, seed=args.seed).start()
+    configure_env(slack, gemini)
+    from gemini_client import warm_imports
+    warm_imports()
+    if args.no_cache:
+        os.environ["TRANSLATOR_CACHE_SIZE"] = "0"
+    if args.minimal_slack_calls:
+        os.environ["MINIMAL_SLACK_CALLS"] = "true"
+
+    target = build_target(args.target, args.concurrency)
+    total = int(args.rps * args.duration)
+    rng = random.Random(args.seed)
+    abusive = {channel_for(i) for i in range(total) if rng.random() < args.abusive_share}
+    sent = {}
+    acks = []
+    ack_errors = 0
+    lock = threading.Lock()
+
+    def fire(index):
+        nonlocal ack_errors
+        channel = channel_for(index)
+        text = "Per my last email, we are pivoting the roadmap effective immediately." if args.same_text else None
+        body, headers = slash_command_request(slack, index, args.command, channel, ABUSER if channel in abusive else None, text)
+        started = time.monotonic()
+        with lock:
+            sent[channel] = started
+        try:
+            status = target.send(body, headers)
+        except Exception as e:
+            print(f"Error sending request {index}: {str(e)}", file=sys.stderr)
+            status = None
+        with lock:
+            acks.append(time.monotonic() - started)
+            if status != 200:
+                ack_errors += 1
+
+    begin = time.monotonic()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        for i in range(total):
+            delay = begin + i / args.rps - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            executor.submit(fire, i)
+    send_elapsed = time.monotonic() - begin
+
+    outcomes = collect_outcomes(slack, dict(sent), args.timeout)
+    target.close()
+
+    completed = [latency for status, latency in outcomes.values() if status == "ok"]
+    others = [latency for channel, (status, latency) in outcomes.items() if status == "ok" and channel not in abusive]
+    failed = sum(1 for status, latency in outcomes.values() if status == "failed")
+    rejected = sum(1 for status, latency in outcomes.values() if status == "rejected")
+    throttled = sum(1 for status, latency in outcomes.values() if status == "throttled")
+    timed_out = total - len(outcomes)
+    writes = slack_writes(slack, [channel for channel, (status, latency) in outcomes.items() if status == "ok"])
+    window = max(send_elapsed, max((sent[channel] - begin + latency for channel, (status, latency) in outcomes.items()), default=0))
+
+    return {
+        "target": args.target,
+        "command": args.command,
+        "requests": total,
+        "offered_rps": args.rps,
+        "achieved_rps": round(total / send_elapsed, 2) if send_elapsed else None,
+        "throughput": round(len(completed) / window, 2) if window else None,
+        "completed": len(completed),
+        "failed": failed,
+        "rejected": rejected,
+        "throttled": throttled,
+        "timed_out": timed_out,
+        "abusive_requests": len(abusive),
+        "ack_errors": ack_errors,
+        "error_rate": round((failed + rejected + timed_out) / total, 4) if total else 0,
+        "ack_latency": latency_summary(acks),
+        "end_to_end_latency": latency_summary(completed),
+        "others_end_to_end_latency": latency_summary(others),
+        "slack_calls": len(slack.calls),
+        "slack_writes_per_request": writes,
+        "counted_slack_calls_per_request": counted_slack_calls(),
+        "slack_injected_failures": len(slack.failures),
+        "slack_rate_limited": len(slack.rate_limited),
+        "slack_retries": slack_retry_count(),
+        "gemini_requests": gemini.requests,
+        "coalesced": coalesced_count(),
+        "gemini_injected_failures": gemini.failures
+    }
+
+def slack_writes(slack, channels):
+    # Every request gets its own channel, so the fake server's log gives each request's writes
+    from bot_metrics import SLACK_WRITE_METHODS
+    per_channel = Counter(params.get("channel") for at, method, params in slack.calls if method in SLACK_WRITE_METHODS)
+    counts = [per_channel[channel] for channel in channels]
+    return {
+        "mean": round(sum(counts) / len(counts), 2) if counts else None,
+        "max": max(counts, default=None)
+    }
+
+def counted_slack_calls():
+    # What the bot's own translator_slack_calls_per_request histogram saw, averaged over all commands
+    from bot_metrics import slack_calls_per_request
+    totals = {}
+    for name, key, value in slack_calls_per_request.samples():
+        calls = dict(key).get("calls")
+        if name.endswith("_sum"):
+            totals.setdefault(calls, [0, 0])[0] += value
+        elif name.endswith("_count"):
+            totals.setdefault(calls, [0, 0])[1] += value
+    return {calls: round(total / count, 2) for calls, (total, count) in totals.items() if count}
+
+def slack_retry_count():
+    from slack_client import slack_retries
+    retries = Counter()
+    for name, key, value in slack_retries.samples():
+        retries[dict(key)["reason"]] += value
+    return dict(retries)
+
+def coalesced_count():
+    from translator import coalesced
+    return sum(coalesced.values.values())
+
+def compare(result, baseline):
+    lines = []
+    for section in ("ack_latency", "end_to_end_latency", "others_end_to_end_latency"):
+        for key in ("p50", "p95", "p99"):
+            old, new = baseline.get(section, {}).get(key), result[section][key]
+            if old and new:
+                lines.append(f"{section} {key}: {old} -> {new} ({(new - old) / old * 100:+.1f}%)")
+    if baseline.get("throughput") and result["throughput"]:
+        lines.append(f"throughput: {baseline['throughput']} -> {result['throughput']} ({(result['throughput'] - baseline['throughput']) / baseline['throughput'] * 100:+.1f}%)")
+    return lines
+
+def main():
+    parser = argparse.ArgumentParser(description="Drive signed slash commands at a bot runtime at a fixed rate against local fake Slack and Gemini servers")
+    parser.add_argument("--target", choices=TARGETS, default="flask", help="flask: HTTP to slack_bot.flask_app, socket: slack_local_bot, async: slack_async_bot")
+    parser.add_argument("--command", default="/tldr")
+    parser.add_argument("--rps", type=float, default=10)
+    parser.add_argument("--duration", type=float, default=10, help="seconds to keep sending")
+    parser.add_argument("--concurrency", type=int, default=64, help="maximum requests waiting on an ack at once")
+    parser.add_argument("--timeout", type=float, default=60, help="seconds to wait for the last response after sending stops")
+    parser.add_argument("--slack-latency", type=float, default=0.02)
+    parser.add_argument("--slack-jitter", type=float, default=0.0)
+    parser.add_argument("--slack-error-rate", type=float, default=0.0)
+    parser.add_argument("--slack-rate-limit-rate", type=float, default=0.0, help="fraction of Slack calls answered with a 429")
+    parser.add_argument("--gemini-latency", type=float, default=0.3)
+    parser.add_argument("--gemini-jitter", type=float, default=0.0)
+    parser.add_argument("--gemini-error-rate", type=float, default=0.0)
+    parser.add_argument("--chunk-delay", type=float, default=0.05)
+    parser.add_argument("--seed", type=int, default=None, help="seed for jitter, error injection and picking abusive requests")
+    parser.add_argument("--abusive-share", type=float, default=0.0, help="fraction of requests sent by a single user, to check that quotas keep everyone else's latency steady")
+    parser.add_argument("--same-text", action="store_true", help="send the same message every time, like a crowd decoding one announcement")
+    parser.add_argument("--no-cache", action="store_true", help="disable the response cache so every request reaches Gemini")
+    parser.add_argument("--minimal-slack-calls", action="store_true", help="run the bot with MINIMAL_SLACK_CALLS=true")
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    parser.add_argument("--baseline", help="earlier --output file to compare against")
+    args = parser.parse_args()
+
+    result = run(args)
+    report = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "config": vars(args),
+        "result": result
+    }
+
+    print(json.dumps(result, indent=2))
+    if args.baseline:
+        with open(args.baseline) as f:
+            for line in compare(result, json.load(f)["result"]):
+                print(line)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    os._exit(0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,250 @@
+import os
+from functools import lru_cache
+from chunking import split_words
+from slack_helpers import MODE_LABELS, describe_failure
+
+# Slack rejects a section with more than 3000 characters of text, a header over 150 and a message over 50 blocks
+SECTION_TEXT_LIMIT = 3000
+HEADER_TEXT_LIMIT = 150
+MESSAGE_BLOCK_LIMIT = 50
+# The notification text repeats the response, so it is cut down to something a notification can show anyway
+FALLBACK_TEXT_LIMIT = int(os.environ.get("FALLBACK_TEXT_LIMIT", 1000))
+# Sections the original message and each response may fill before the rest goes behind a "Show full" button;
+# capped so that /decode --all stays under the block limit
+INPUT_SECTIONS = min(10, max(1, int(os.environ.get("BLOCKS_INPUT_SECTIONS", 2))))
+RESPONSE_SECTIONS = min(10, max(1, int(os.environ.get("BLOCKS_RESPONSE_SECTIONS", 4))))
+
+ELLIPSIS = "\n> …"
+# Slack fetches this for every loading message; blank shows a plain text line instead
+LOADING_IMAGE_URL = os.environ.get("LOADING_IMAGE_URL", "https://media2.giphy.com/media/v1.Y2lkPTc5MGI3NjExeGF1NGRpMGszanFpYW56MTZ3Mmg0ZTBxZGdjbW0yOXNnNjV2MG95MyZlcD12MV9pbnRlcm5hbF9naWZfYnlfaWQmY3Q9Zw/jAYUbVXgESSti/giphy.gif")
+EMPTY_RESPONSE = "⚠️ The AI came back empty-handed for this one, try regenerating."
+
+# Static blocks are built once and shared between payloads; nothing downstream mutates them
+DIVIDER = {"type": "divider"}
+
+GENERATING = {
+    "type": "section",
+    "text": {
+        "type": "mrkdwn",
+        "text": "*Generating response...*"
+    }
+}
+
+GENERATING_PLAIN = {
+    "type": "section",
+    "text": {
+        "type": "mrkdwn",
+        "text": "*Generating response...* ⏳"
+    }
+}
+
+SPINNER = {
+    "type": "section",
+    "text": {
+        "type": "mrkdwn",
+        "text": " "
+    },
+    "accessory": {
+        "type": "image",
+        "image_url": LOADING_IMAGE_URL,
+        "alt_text": "Loading..."
+    }
+}
+
+USE_BUTTON = {
+    "type": "button",
+    "text": {
+        "type": "plain_text",
+        "text": "✅ Use This"
+    },
+    "action_id": "use_message",
+    "style": "primary"
+}
+
+REGENERATE_BUTTON = {
+    "type": "button",
+    "text": {
+        "type": "plain_text",
+        "text": "🔄 Regenerate"
+    },
+    "action_id": "regenerate_message"
+}
+
+EMAIL_BUTTON = {
+    "type": "button",
+    "text": {
+        "type": "plain_text",
+        "text": "📨 Send as Email"
+    },
+    "action_id": "email_message"
+}
+
+SHOW_INPUT_BUTTON = {
+    "type": "button",
+    "text": {
+        "type": "plain_text",
+        "text": "📖 Show full message"
+    },
+    "action_id": "show_full_input"
+}
+
+SHOW_RESPONSE_BUTTON = {
+    "type": "button",
+    "text": {
+        "type": "plain_text",
+        "text": "📖 Show full response"
+    },
+    "action_id": "show_full_response"
+}
+
+def section(text):
+    return {
+        "type": "section",
+        "text": {
+            "type": "mrkdwn",
+            "text": text
+        }
+    }
+
+def button(template, value):
+    return {**template, "value": value}
+
+@lru_cache(maxsize=64)
+def header_block(text):
+    if len(text) > HEADER_TEXT_LIMIT:
+        text = text[:HEADER_TEXT_LIMIT - 1] + "…"
+    return {
+        "type": "header",
+        "text": {
+            "type": "plain_text",
+            "text": text
+        }
+    }
+
+@lru_cache(maxsize=1024)
+def context_block(user_id, is_link=False):
+    return {
+        "type": "context",
+        "elements": [
+            {
+                "type": "mrkdwn",
+                "text": f"Requested by <@{user_id}> | Corporate Translator {'📎' if is_link else ''}"
+            }
+        ]
+    }
+
+def quoted_pieces(title, text, max_pieces, limit=SECTION_TEXT_LIMIT):
+    # Quotes the text in one pass while packing whole lines into section-sized pieces, the first one
+    # after the title; only a line too long for a section by itself is broken between words
+    room = limit - len(ELLIPSIS)
+    first = f"{title}\n\n" if title else ""
+    quoted = "> " + text.replace("\n", "\n> ")
+    if len(first) + len(quoted) <= limit:
+        return [first + quoted], False
+
+    width = room - len(first) - 2
+    pieces = []
+    current = []
+    size = len(first)
+
+    for line in text.split("\n"):
+        for part in (split_words(line, width) if len(line) > width else [line]):
+            quoted = f"> {part}"
+            added = len(quoted) + 1 if current else len(quoted)
+            if current and size + added > room:
+                pieces.append("\n".join(current))
+                if len(pieces) == max_pieces:
+                    pieces[0] = first + pieces[0]
+                    pieces[-1] += ELLIPSIS
+                    return pieces, True
+                current = []
+                size = 0
+                added = len(quoted)
+            current.append(quoted)
+            size += added
+
+    pieces.append("\n".join(current))
+    pieces[0] = first + pieces[0]
+    return pieces, False
+
+def quoted_sections(title, text, max_sections):
+    pieces, truncated = quoted_pieces(title, text, max_sections)
+    return [section(piece) for piece in pieces], truncated
+
+def fallback_text(prefix, text):
+    text = f"{prefix}{text}"
+    if len(text) > FALLBACK_TEXT_LIMIT:
+        return text[:FALLBACK_TEXT_LIMIT - 1] + "…"
+    return text
+
+def full_text_blocks(title, text):
+    # The whole text as its own message, for the "Show full" buttons
+    sections, truncated = quoted_sections(f"*{title}:*", text, MESSAGE_BLOCK_LIMIT - 1)
+    if truncated:
+        sections.append(section("✂️ That's as much as fits in one Slack message."))
+    return sections
+
+class MessageView:
+    # Renders every payload of one request: the original message is quoted and split once and reused
+    # by the loading, streaming, error and final versions of the message
+    def __init__(self, header_text, user_message, input_description, user_id, is_link=False):
+        self.header = header_block(header_text)
+        self.context = context_block(user_id, is_link)
+        self.input, self.input_truncated = quoted_sections(f"*{input_description}:*", user_message, INPUT_SECTIONS)
+
+    def head(self, job_id=None):
+        blocks = [self.header, *self.input]
+        if self.input_truncated and job_id is not None:
+            blocks.append({"type": "actions", "elements": [button(SHOW_INPUT_BUTTON, job_id)]})
+        return blocks
+
+    def loading(self, job_id=None, spinner=True):
+        if spinner and LOADING_IMAGE_URL:
+            return [*self.head(job_id), GENERATING, SPINNER, self.context]
+        return [*self.head(job_id), GENERATING_PLAIN, self.context]
+
+    def streaming(self, partial_response, job_id=None):
+        sections, truncated = quoted_sections("*Generating response...*", partial_response + " ▌", RESPONSE_SECTIONS)
+        return [*self.head(job_id), *sections, self.context]
+
+    def error(self, error, mode=None, job_id=None):
+        blocks = [*self.head(job_id), section(describe_failure(error)), self.context]
+
+        if job_id is not None:
+            retry = {**REGENERATE_BUTTON, "text": {"type": "plain_text", "text": "🔄 Try Again"}}
+            if mode == "email":
+                retry["action_id"] = "regenerate_email"
+            blocks.append({"type": "actions", "elements": [button(retry, job_id)]})
+
+        return blocks
+
+    def final(self, response, mode, job_id=None, response_index=0):
+        sections, truncated = quoted_sections("*Generated Response:*", response, RESPONSE_SECTIONS)
+        elements = [button(USE_BUTTON, f"{job_id}:{response_index}"), button(REGENERATE_BUTTON, job_id)]
+        if mode == "corporate":
+            elements.append(button(EMAIL_BUTTON, f"{job_id}:{response_index}"))
+        if truncated:
+            elements.append(button(SHOW_RESPONSE_BUTTON, f"{job_id}:{response_index}"))
+
+        return [*self.head(job_id), *sections, self.context, DIVIDER, {"type": "actions", "elements": elements}]
+
+    def multi_final(self, responses, job_ids):
+        blocks = self.head(next(iter(job_ids.values()), None))
+
+        for mode, response in responses.items():
+            blocks.append(DIVIDER)
+
+            if response is None:
+                blocks.append(section(f"*{MODE_LABELS[mode]}:*\n\n{EMPTY_RESPONSE}"))
+                blocks.append({"type": "actions", "elements": [button(REGENERATE_BUTTON, job_ids[mode])]})
+                continue
+
+            sections, truncated = quoted_sections(f"*{MODE_LABELS[mode]}:*", response, RESPONSE_SECTIONS)
+            blocks.extend(sections)
+            elements = [button(USE_BUTTON, f"{job_ids[mode]}:0"), button(REGENERATE_BUTTON, job_ids[mode])]
+            if truncated:
+                elements.append(button(SHOW_RESPONSE_BUTTON, f"{job_ids[mode]}:0"))
+            blocks.append({"type": "actions", "elements": elements})
+
+        blocks.append(self.context)
+        return blocks
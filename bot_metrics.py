@@ -0,0 +1,91 @@
+import contextvars
+import time
+from collections import Counter
+from contextlib import contextmanager
+import metrics
+
+requests = metrics.counter("translator_requests_total", "Slash commands, button clicks and events handled, by command")
+stage_seconds = metrics.histogram("translator_stage_seconds", "Time per request stage: ack, link_fetch, placeholder, first_token, generation, chat_update, total")
+errors = metrics.counter("translator_errors_total", "Failures by command and exception type")
+in_flight = metrics.gauge("translator_requests_in_flight", "Requests being worked on right now, by command")
+slack_calls = metrics.counter("translator_slack_calls_total", "Slack Web API calls by command and method")
+slack_calls_per_request = metrics.histogram("translator_slack_calls_per_request", "Slack Web API calls made while working on one request, all of them and writes only", buckets=(1, 2, 3, 4, 5, 6, 8, 10, 15, 20, 50))
+
+# Posting, updating or deleting a message; everything else is a read
+SLACK_WRITE_METHODS = {"chat.postMessage", "chat.update", "chat.delete", "chat.postEphemeral"}
+
+current_command = contextvars.ContextVar("current_command", default="unknown")
+request_slack_calls = contextvars.ContextVar("request_slack_calls", default=None)
+
+def request_name(body):
+    if body.get("command"):
+        return body["command"]
+    if body.get("actions"):
+        return body["actions"][0].get("action_id", "action")
+    if body.get("event"):
+        return body["event"].get("type", "event")
+    return body.get("type") or "unknown"
+
+def observe(stage, seconds, command=None):
+    stage_seconds.observe(seconds, command=command or current_command.get(), stage=stage)
+
+@contextmanager
+def stage(name):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(name, time.perf_counter() - started)
+
+def count_slack_call(method):
+    slack_calls.inc(command=current_command.get(), method=method)
+    calls = request_slack_calls.get()
+    if calls is not None:
+        calls[method] += 1
+
+def observe_slack_calls(name, calls):
+    slack_calls_per_request.observe(sum(calls.values()), command=name, calls="all")
+    slack_calls_per_request.observe(sum(count for method, count in calls.items() if method in SLACK_WRITE_METHODS), command=name, calls="writes")
+
+def record_error(error, command=None):
+    errors.inc(command=command or current_command.get(), type=type(error).__name__)
+
+def track(name, work):
+    requests.inc(command=name)
+
+    def tracked():
+        current_command.set(name)
+        calls = Counter()
+        request_slack_calls.set(calls)
+        in_flight.inc(command=name)
+        try:
+            with stage("total"):
+                return work()
+        except Exception as e:
+            record_error(e)
+            raise
+        finally:
+            in_flight.dec(command=name)
+            observe_slack_calls(name, calls)
+
+    return tracked
+
+def atrack(name, work):
+    requests.inc(command=name)
+
+    async def tracked():
+        current_command.set(name)
+        calls = Counter()
+        request_slack_calls.set(calls)
+        in_flight.inc(command=name)
+        try:
+            with stage("total"):
+                return await work()
+        except Exception as e:
+            record_error(e)
+            raise
+        finally:
+            in_flight.dec(command=name)
+            observe_slack_calls(name, calls)
+
+    return tracked
@@ -0,0 +1,86 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from slack_sdk.errors import SlackApiError
+
+# Pacing and 429 retries come from the shared Slack client (slack_client.py), which every call here goes through
+CLEAR_CONCURRENCY = int(os.environ.get("CLEAR_CONCURRENCY", 4))
+CLEAR_PROGRESS_INTERVAL = float(os.environ.get("CLEAR_PROGRESS_INTERVAL", 5))
+
+SKIPPABLE_ERRORS = {
+    "cant_delete_message",
+    "message_not_found",
+    "compliance_exports_prevent_deletion",
+    "cant_update_message"
+}
+
+class ClearStats:
+    def __init__(self):
+        self.deleted = 0
+        self.skipped = 0
+        self.failed = 0
+        self.pages = 0
+        self.started = time.monotonic()
+        self.lock = threading.Lock()
+
+    def add(self, field, amount=1):
+        with self.lock:
+            setattr(self, field, getattr(self, field) + amount)
+
+    def elapsed(self):
+        return time.monotonic() - self.started
+
+    def throughput(self):
+        elapsed = self.elapsed()
+        return self.deleted / elapsed if elapsed > 0 else 0.0
+
+    def summary(self):
+        return f"deleted {self.deleted}, skipped {self.skipped}, failed {self.failed} in {self.elapsed():.1f}s ({self.throughput():.2f} msg/s)"
+
+def delete_message(client, stats, channel_id, ts):
+    try:
+        client.chat_delete(channel=channel_id, ts=ts)
+        stats.add("deleted")
+    except SlackApiError as e:
+        error = e.response["error"]
+        if error in SKIPPABLE_ERRORS:
+            stats.add("skipped")
+        else:
+            print(f"Error deleting message {ts}: {error}")
+            stats.add("failed")
+    except Exception as e:
+        print(f"Error deleting message {ts}: {str(e)}")
+        stats.add("failed")
+
+def clear_channel(client, channel_id, skip_ts=(), progress=None, concurrency=CLEAR_CONCURRENCY):
+    stats = ClearStats()
+    last_progress = time.monotonic()
+    cursor = None
+    pending = set()
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        while True:
+            response = client.conversations_history(channel=channel_id, limit=200, cursor=cursor)
+            stats.add("pages")
+
+            for message in response["messages"]:
+                if message["ts"] in skip_ts:
+                    continue
+
+                while len(pending) >= concurrency * 2:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+
+                pending.add(executor.submit(delete_message, client, stats, channel_id, message["ts"]))
+
+                if progress and time.monotonic() - last_progress >= CLEAR_PROGRESS_INTERVAL:
+                    last_progress = time.monotonic()
+                    progress(stats)
+
+            cursor = response.get("response_metadata", {}).get("next_cursor")
+            if not response.get("has_more") or not cursor:
+                break
+
+        wait(pending)
+
+    return stats
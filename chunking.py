@@ -0,0 +1,50 @@
+import re
+
+PARAGRAPH_BREAK = re.compile(r"\n\s*\n")
+SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+def split_words(text, max_chars):
+    pieces = []
+    current = ""
+    for word in text.split():
+        while len(word) > max_chars:
+            if current:
+                pieces.append(current)
+                current = ""
+            pieces.append(word[:max_chars])
+            word = word[max_chars:]
+        if current and len(current) + 1 + len(word) > max_chars:
+            pieces.append(current)
+            current = ""
+        current = f"{current} {word}" if current else word
+    if current:
+        pieces.append(current)
+    return pieces
+
+def split_text(text, max_chars):
+    text = text.strip()
+    if max_chars <= 0 or len(text) <= max_chars:
+        return [text]
+
+    # Break on paragraphs first, then sentences, and only split words inside a sentence that is too long by itself
+    pieces = []
+    for paragraph in PARAGRAPH_BREAK.split(text):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        separator = "\n\n"
+        for sentence in ([paragraph] if len(paragraph) <= max_chars else SENTENCE_END.split(paragraph)):
+            for piece in ([sentence] if len(sentence) <= max_chars else split_words(sentence, max_chars)):
+                pieces.append((separator, piece))
+                separator = " "
+
+    chunks = []
+    current = ""
+    for separator, piece in pieces:
+        if current and len(current) + len(separator) + len(piece) > max_chars:
+            chunks.append(current)
+            current = ""
+        current = current + separator + piece if current else piece
+    if current:
+        chunks.append(current)
+    return chunks
@@ -0,0 +1,215 @@
+import os
+from prompts import get_mode
+from quota import quota, QuotaExceeded, estimate_tokens, slow_down_message
+from speculation import SPECULATE_EMAIL, speculator, speculate_email
+from state_store import state_store, load_button_job, load_button_response
+from slack_helpers import format_quoted_message, extract_message_links, describe_failure
+from blocks import MessageView, fallback_text, full_text_blocks
+from slack_client import slack_limiter, SLACK_UPDATE_RESERVE
+
+# Everything both runtimes say and render; slack_app and slack_async_bot only make the calls
+
+# At most two Slack writes per translation: no streamed updates and no remote loading GIF
+MINIMAL_SLACK_CALLS = os.environ.get("MINIMAL_SLACK_CALLS", "false").lower() == "true"
+STREAM_RESPONSES = os.environ.get("STREAM_RESPONSES", "true").lower() == "true" and not MINIMAL_SLACK_CALLS
+
+EXPIRED_BUTTON = "⌛ That button has expired - run the command again to get a fresh one."
+INVALID_LINK = "❌ Please send a valid link or check again!"
+QUEUE_FULL = "🚦 The translator is swamped right now, try again in a minute!"
+CLEARING = "🧹 Clearing the evidence..."
+
+COMMANDS = {
+    "/tellboss": {
+        "modes": ["corporate"],
+        "usage": "Usage: `/tellboss [your message or Slack message link]`\nExample: `/tellboss Gimme a raise`",
+        "placeholder": "Sending your request to AI 🤖...",
+        "header": "📢 Message for Your Boss 😁",
+        "input_description": "Your Message"
+    },
+    "/tldr": {
+        "modes": ["casual"],
+        "usage": "Usage: `/tldr [your message or Slack message link]`\nExample: `/tldr Let's circle back to this after we align on our Q3 priorities.`\nOr: `/tldr https://workspace.slack.com/archives/C1234567890/p1234567890123456`",
+        "placeholder": "Processing your request...",
+        "header": "📢 Message from your Boss 😡",
+        "input_description": "Boss's Message"
+    },
+    "/befr": {
+        "modes": ["real"],
+        "usage": "Usage: `/befr [your message or Slack message link]`\nExample: `/befr Let's circle back to this after we align on our Q3 priorities.`",
+        "placeholder": "Processing your request...",
+        "header": "📢 What your boss actually means 🙄",
+        "input_description": "Boss's Message"
+    },
+    "/decode": {
+        "modes": ["casual", "real"],
+        "all_modes": ["corporate", "casual", "real"],
+        "usage": "Usage: `/decode [--all] [your message or Slack message link]`\nExample: `/decode Let's circle back to this after we align on our Q3 priorities.`\nAdd `--all` to get the corporate version too.",
+        "placeholder": "Decoding your boss... 🔍",
+        "header": "📢 Your boss, fully decoded 🔍",
+        "input_description": "Boss's Message"
+    }
+}
+
+REGENERATE_HEADERS = {
+    "corporate": "🔄 Regenerated Message for Your Boss 😁",
+    "casual": "🔄 Regenerated Message from Your Boss 😡",
+    "real": "🔄 Regenerated - What your boss actually means 🙄",
+    "email": "🔄 Regenerated Email Version"
+}
+
+def parse_command(name, text):
+    # The text to translate and the modes to translate it into; no text means the usage hint
+    spec = COMMANDS[name]
+    user_input = (text or "").strip()
+    modes = spec["modes"]
+    # Only a whole "--all" token: "--allow me to explain" is the message itself
+    if "all_modes" in spec and user_input.split(None, 1)[:1] == ["--all"]:
+        modes = spec["all_modes"]
+        user_input = user_input[len("--all"):].strip()
+    return user_input, modes
+
+def parse_input(user_input):
+    # Either the message itself or the Slack message links to fetch it from
+    user_input = user_input.strip()
+    if user_input.startswith("https://") and "slack.com/archives/" in user_input:
+        return None, extract_message_links(user_input)
+    return user_input, None
+
+def input_description(name, is_link):
+    return "Message from link" if is_link else COMMANDS[name]["input_description"]
+
+def charge_quota(user_id, channel_id, team_id, tokens, name):
+    try:
+        quota.charge(user_id, channel_id, team_id, tokens, name)
+    except QuotaExceeded as e:
+        return slow_down_message(e)
+    return None
+
+def refund_quota(user_id, channel_id, team_id, tokens):
+    quota.refund(user_id, channel_id, team_id, tokens)
+
+def queued_message(position):
+    return f"⏳ Queued, position {position} - your boss can wait a little longer"
+
+class Translation:
+    # One translated Slack message: the job behind its buttons and each payload it goes through
+    def __init__(self, channel_id, placeholder_text, user_message, mode, header_text, input_description, user_id, is_link=False, job_id=None):
+        self.job_id = job_id
+        self.channel_id = channel_id
+        self.placeholder_text = placeholder_text
+        self.user_message = user_message
+        self.mode = mode
+        self.user_id = user_id
+        self.is_link = is_link
+        self.view = MessageView(header_text, user_message, input_description, user_id, is_link)
+        self.ts = None
+
+    def loading(self):
+        # The job is only stored once the translation runs, not for requests the quota or queue turned away
+        if self.job_id is None:
+            self.job_id = state_store.create_job(self.user_message, get_mode(self.mode).name, self.is_link, self.user_id, self.channel_id)
+        # The first message already shows the loading state, so a translation is one post plus the final update
+        return {"channel": self.channel_id, "blocks": self.view.loading(self.job_id, spinner=not MINIMAL_SLACK_CALLS), "text": self.placeholder_text}
+
+    def streaming(self, response):
+        # Streamed updates are optional, so they give way before the final update would have to wait
+        if slack_limiter.remaining("chat.update") < SLACK_UPDATE_RESERVE:
+            return None
+        return self.update(self.view.streaming(response, self.job_id), fallback_text("Generating response: ", response))
+
+    def error(self, error):
+        return self.update(self.view.error(error, self.mode, self.job_id), describe_failure(error))
+
+    def final(self, response):
+        response_index = state_store.add_response(self.job_id, response)
+        if SPECULATE_EMAIL and response_index is not None and get_mode(self.mode).name == "corporate":
+            # Most "Send as Email" clicks come within seconds, so start that generation now
+            speculate_email(f"{self.job_id}:{response_index}", response)
+        return self.update(self.view.final(response, self.mode, self.job_id, response_index), fallback_text("Generated response: ", response))
+
+    def update(self, blocks, text):
+        return {"channel": self.channel_id, "ts": self.ts, "blocks": blocks, "text": text}
+
+def command_translation(name, command, user_message, is_link):
+    spec = COMMANDS[name]
+    return Translation(command["channel_id"], spec["placeholder"], user_message, spec["modes"][0], spec["header"], input_description(name, is_link), command["user_id"], is_link)
+
+class Decoding:
+    # /decode: several translations of one message, posted together once all of them are done
+    def __init__(self, command, user_message, is_link):
+        spec = COMMANDS["/decode"]
+        self.channel_id = command["channel_id"]
+        self.user_id = command["user_id"]
+        self.user_message = user_message
+        self.is_link = is_link
+        self.view = MessageView(spec["header"], user_message, input_description("/decode", is_link), self.user_id, is_link)
+        self.ts = None
+
+    def loading(self):
+        return {"channel": self.channel_id, "blocks": self.view.loading(spinner=not MINIMAL_SLACK_CALLS), "text": COMMANDS["/decode"]["placeholder"]}
+
+    def error(self, error):
+        return {"channel": self.channel_id, "ts": self.ts, "blocks": self.view.error(error), "text": describe_failure(error)}
+
+    def final(self, responses):
+        job_ids = {
+            mode: state_store.create_job(self.user_message, mode, self.is_link, self.user_id, self.channel_id, history=[response] if response else [])
+            for mode, response in responses.items()
+        }
+        text = fallback_text("Decoded: ", " | ".join(response for response in responses.values() if response))
+        return {"channel": self.channel_id, "ts": self.ts, "blocks": self.view.multi_final(responses, job_ids), "text": text}
+
+def clearing_progress(stats):
+    return f"{CLEARING} {stats.summary()}"
+
+def cleared_message(stats):
+    return f"Nothing to see (anymore!) 🐱‍👤 ({stats.summary()})"
+
+def clear_failed_message(user_id, error):
+    return f"<@{user_id}>: Message can't be deleted WTF - {error.response['error']}"
+
+def button_value(body):
+    return body["actions"][0]["value"]
+
+def button_context(body):
+    return body["user"]["id"], body["channel"]["id"], body.get("team", {}).get("id")
+
+def used_message(body):
+    message = load_button_response(button_value(body))
+    if message is None:
+        return None
+    return f"✅ <@{body['user']['id']}> used this message: \n\n{format_quoted_message(message)}"
+
+def full_input_reply(body):
+    job = load_button_job(button_value(body))
+    if job is None:
+        return {"text": EXPIRED_BUTTON}
+    return {"text": fallback_text("Original message: ", job["input"]), "blocks": full_text_blocks("Original Message", job["input"]), "replace_original": False}
+
+def full_response_reply(body):
+    message = load_button_response(button_value(body))
+    if message is None:
+        return {"text": EXPIRED_BUTTON}
+    return {"text": fallback_text("Generated response: ", message), "blocks": full_text_blocks("Generated Response", message), "replace_original": False}
+
+def regeneration(body, mode=None):
+    # The button's job regenerated in place: same input, same job ID, never from the cache
+    job = load_button_job(button_value(body), mode)
+    if job is None:
+        return None
+    user_id, channel_id, team_id = button_context(body)
+    mode = get_mode(mode or job["mode"]).name
+    placeholder = "Regenerating email 📨..." if mode == "email" else "Regenerating..."
+    return Translation(channel_id, placeholder, job["input"], mode, REGENERATE_HEADERS.get(mode, REGENERATE_HEADERS["real"]), "Original Message", user_id, job_id=job["id"])
+
+def email_translation(body):
+    message = load_button_response(button_value(body))
+    if message is None:
+        return None, None
+    user_id, channel_id, team_id = button_context(body)
+    # A claimed speculative result stands in for the stream, falling back to a fresh generation if it failed
+    prefetched = speculator.claim(button_value(body)) if SPECULATE_EMAIL else None
+    return Translation(channel_id, "Generating email 📨...", message, "email", "📧 Email  Generated", "Original Message", user_id), prefetched
+
+def translation_tokens(translation):
+    return estimate_tokens(translation.user_message, [translation.mode])
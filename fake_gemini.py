@@ -0,0 +1,100 @@
+import asyncio
+import threading
+import time
+
+class FakeUsage:
+    def __init__(self, prompt_token_count, candidates_token_count):
+        self.prompt_token_count = prompt_token_count
+        self.candidates_token_count = candidates_token_count
+
+class FakeChunk:
+    def __init__(self, text, usage_metadata=None):
+        self.text = text
+        self.usage_metadata = usage_metadata
+
+class FakeConnectionPool:
+    def __init__(self, max_connections=20):
+        self.max_connections = max_connections
+        self.opened = 0
+        self.reused = 0
+        self.idle = 0
+        self.in_use = 0
+        self.lock = threading.Condition()
+
+    def acquire(self):
+        with self.lock:
+            while self.idle == 0 and self.in_use >= self.max_connections:
+                self.lock.wait()
+            if self.idle > 0:
+                self.idle -= 1
+                self.reused += 1
+            else:
+                self.opened += 1
+            self.in_use += 1
+
+    def release(self):
+        with self.lock:
+            self.in_use -= 1
+            self.idle += 1
+            self.lock.notify()
+
+class FakeModels:
+    def __init__(self, client):
+        self.client = client
+
+    def generate_content_stream(self, model, contents, config=None):
+        self.client.calls.append(model)
+        self.client.pool.acquire()
+        try:
+            time.sleep(self.client.model_delays.get(model, 0))
+            if model in self.client.failing_models:
+                raise Exception(f"{model} is unavailable")
+            for chunk in self.client.response_for(contents):
+                if self.client.chunk_delay:
+                    time.sleep(self.client.chunk_delay)
+                yield FakeChunk(chunk)
+            yield FakeChunk("", self.client.usage_for(contents))
+        finally:
+            self.client.pool.release()
+
+class FakeAsyncModels:
+    def __init__(self, client):
+        self.client = client
+
+    async def generate_content_stream(self, model, contents, config=None):
+        self.client.calls.append(model)
+        return self._stream(model, contents)
+
+    async def _stream(self, model, contents):
+        await asyncio.sleep(self.client.model_delays.get(model, 0))
+        if model in self.client.failing_models:
+            raise Exception(f"{model} is unavailable")
+        for chunk in self.client.response_for(contents):
+            if self.client.chunk_delay:
+                await asyncio.sleep(self.client.chunk_delay)
+            yield FakeChunk(chunk)
+        yield FakeChunk("", self.client.usage_for(contents))
+
+class FakeAio:
+    def __init__(self, client):
+        self.models = FakeAsyncModels(client)
+
+class FakeGeminiClient:
+    def __init__(self, response="Synergy achieved.", chunk_size=8, chunk_delay=0, max_connections=20, model_delays=None, failing_models=()):
+        self.response = response
+        self.chunk_size = chunk_size
+        self.chunk_delay = chunk_delay
+        self.model_delays = model_delays or {}
+        self.failing_models = set(failing_models)
+        self.calls = []
+        self.pool = FakeConnectionPool(max_connections)
+        self.models = FakeModels(self)
+        self.aio = FakeAio(self)
+
+    def response_for(self, contents):
+        text = self.response
+        return [text[i:i + self.chunk_size] for i in range(0, len(text), self.chunk_size)]
+
+    def usage_for(self, contents):
+        prompt = " ".join(part.text or "" for content in contents for part in content.parts)
+        return FakeUsage(len(prompt) // 4, len(self.response) // 4)
@@ -0,0 +1,72 @@
+import os
+import threading
+
+MAX_CONNECTIONS = int(os.environ.get("GEMINI_MAX_CONNECTIONS", 20))
+MAX_KEEPALIVE_CONNECTIONS = int(os.environ.get("GEMINI_MAX_KEEPALIVE_CONNECTIONS", 10))
+KEEPALIVE_EXPIRY = float(os.environ.get("GEMINI_KEEPALIVE_EXPIRY", 60))
+TIMEOUT_MS = int(os.environ.get("GEMINI_TIMEOUT_MS", 30000))
+BASE_URL = os.environ.get("GEMINI_BASE_URL")
+
+_client = None
+_client_lock = threading.Lock()
+client_builds = 0
+
+def warm_imports():
+    # google.genai builds a few hundred pydantic models on import (over a second
+    # on a small instance); nothing needs it until the first generation
+    import httpx
+    from google import genai
+    from google.genai import errors, types
+
+def pool_limits():
+    import httpx
+
+    return httpx.Limits(
+        max_connections=MAX_CONNECTIONS,
+        max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=KEEPALIVE_EXPIRY
+    )
+
+def build_client():
+    import httpx
+    from google import genai
+    from google.genai import types
+
+    api_key = os.environ.get("GEMINI_API_KEY")
+    if not api_key:
+        raise Exception("GEMINI_API_KEY environment variable is not set")
+
+    limits = pool_limits()
+    http_options = types.HttpOptions(
+        base_url=BASE_URL,
+        timeout=TIMEOUT_MS,
+        client_args={"limits": limits},
+        # An explicit transport keeps the async client on pooled httpx; otherwise
+        # genai opens a fresh aiohttp session for every streamed request.
+        async_client_args={"transport": httpx.AsyncHTTPTransport(limits=limits)}
+    )
+    return genai.Client(api_key=api_key, http_options=http_options)
+
+def get_client():
+    global _client, client_builds
+
+    if _client is not None:
+        return _client
+
+    with _client_lock:
+        if _client is None:
+            _client = build_client()
+            client_builds += 1
+        return _client
+
+def set_client(client):
+    global _client
+
+    with _client_lock:
+        _client = client
+
+def reset_client():
+    global _client
+
+    with _client_lock:
+        _client = None
@@ -0,0 +1,73 @@
+import os
+import threading
+import time
+from gunicorn.workers.gthread import ThreadWorker
+
+# Run with: gunicorn -c gunicorn.conf.py
+wsgi_app = "slack_bot:flask_app"
+bind = f"0.0.0.0:{os.environ.get('PORT', 3000)}"
+
+# Button clicks can reach any worker, so their job state must live somewhere every worker can read it
+STATE_STORE = os.environ.get("STATE_STORE", "memory")
+workers = int(os.environ.get("WEB_CONCURRENCY", 1 if STATE_STORE == "memory" else 2))
+if workers > 1 and STATE_STORE == "memory":
+    raise SystemExit(f"WEB_CONCURRENCY={workers} needs STATE_STORE=sqlite or STATE_STORE=redis: with the in-memory store each worker has its own jobs and buttons expire on the others")
+threads = int(os.environ.get("GUNICORN_THREADS", 8))
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 30))
+graceful_timeout = int(os.environ.get("GUNICORN_GRACEFUL_TIMEOUT", 60))
+keepalive = int(os.environ.get("GUNICORN_KEEPALIVE", 5))
+max_requests = int(os.environ.get("GUNICORN_MAX_REQUESTS", 2000))
+max_requests_jitter = int(os.environ.get("GUNICORN_MAX_REQUESTS_JITTER", 200))
+preload_app = os.environ.get("GUNICORN_PRELOAD", "true").lower() == "true"
+accesslog = os.environ.get("GUNICORN_ACCESS_LOG")
+
+FAST_START = os.environ.get("FAST_START", "false").lower() == "true"
+
+class DrainingWorker(ThreadWorker):
+    # Slack gets its ack before the translation runs, so the HTTP requests finish
+    # long before the job queue does; keep the worker alive (and heartbeating)
+    # until queued generations are done or graceful_timeout is nearly up.
+    exit_requested_at = None
+
+    def handle_exit(self, sig, frame):
+        # Flip /readyz to 503 and turn new jobs away while the accept loop is still running
+        from job_queue import job_queue
+        job_queue.draining = True
+        self.exit_requested_at = time.monotonic()
+        super().handle_exit(sig, frame)
+
+    def run(self):
+        super().run()
+
+        # The arbiter kills the worker graceful_timeout after SIGTERM, and gthread's own wait for requests already spent part of it
+        from job_queue import job_queue
+        started = self.exit_requested_at or time.monotonic()
+        remaining = self.cfg.graceful_timeout - (time.monotonic() - started) - 2
+        if job_queue.drain(max(remaining, 0), tick=self.notify):
+            self.log.info("Job queue drained")
+        else:
+            self.log.warning("Exiting with %(pending)s queued and %(running)s running jobs", job_queue.status())
+
+worker_class = DrainingWorker
+
+def on_starting(server):
+    # Importing before the fork shares the Gemini SDK between workers; threads must not be running yet
+    if not FAST_START:
+        from gemini_client import warm_imports
+        warm_imports()
+
+def post_fork(server, worker):
+    # Connections opened while preloading must not be shared across processes
+    from gemini_client import reset_client, warm_imports
+    from response_cache import response_cache
+    from state_store import state_store
+    from quota import usage_store
+    from slack_client import reset_pool
+
+    reset_client()
+    response_cache.reconnect()
+    state_store.backend.reconnect()
+    usage_store.reconnect()
+    reset_pool()
+    if FAST_START:
+        threading.Thread(target=warm_imports, name="warm-imports", daemon=True).start()
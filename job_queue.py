@@ -0,0 +1,188 @@
+import asyncio
+import os
+import threading
+import time
+from collections import Counter
+import metrics
+
+WORKER_POOL_SIZE = int(os.environ.get("WORKER_POOL_SIZE", 8))
+ASYNC_WORKER_POOL_SIZE = int(os.environ.get("ASYNC_WORKER_POOL_SIZE", 200))
+JOB_QUEUE_MAX_DEPTH = int(os.environ.get("JOB_QUEUE_MAX_DEPTH", 100))
+MAX_JOBS_PER_USER = int(os.environ.get("MAX_JOBS_PER_USER", 2))
+MAX_JOBS_PER_WORKSPACE = int(os.environ.get("MAX_JOBS_PER_WORKSPACE", 6))
+
+queue_depth = metrics.gauge("translator_job_queue_depth", "Jobs waiting for a worker")
+jobs_running = metrics.gauge("translator_jobs_running", "Jobs currently being served")
+job_wait_seconds = metrics.histogram("translator_job_wait_seconds", "Time a job waited in the queue before a worker picked it up")
+job_service_seconds = metrics.histogram("translator_job_service_seconds", "Time a worker spent serving a job")
+jobs_rejected = metrics.counter("translator_jobs_rejected_total", "Jobs rejected because the queue was full")
+
+class QueueFull(Exception):
+    pass
+
+class Job:
+    def __init__(self, fn, user_id, team_id, name):
+        self.fn = fn
+        self.user_id = user_id
+        self.team_id = team_id
+        self.name = name
+        self.enqueued_at = time.monotonic()
+
+class JobQueue:
+    def __init__(self, workers=WORKER_POOL_SIZE, max_depth=JOB_QUEUE_MAX_DEPTH, per_user=MAX_JOBS_PER_USER, per_workspace=MAX_JOBS_PER_WORKSPACE):
+        self.workers = workers
+        self.max_depth = max_depth
+        self.per_user = per_user
+        self.per_workspace = per_workspace
+        self.pending = []
+        self.busy = 0
+        self.active_users = Counter()
+        self.active_teams = Counter()
+        self.started = False
+        self.draining = False
+        self.cond = threading.Condition()
+
+    def submit(self, fn, user_id, team_id=None, name="job"):
+        with self.cond:
+            job = self._enqueue(fn, user_id, team_id, name)
+            if not self.started:
+                self.started = True
+                for i in range(self.workers):
+                    threading.Thread(target=self._work, name=f"translator-worker-{i}", daemon=True).start()
+            self.cond.notify_all()
+            return self._position(job)
+
+    def status(self):
+        return {
+            "pending": len(self.pending),
+            "running": self.busy,
+            "workers": self.workers,
+            "max_depth": self.max_depth,
+            "draining": self.draining
+        }
+
+    def drain(self, timeout, tick=None):
+        deadline = time.monotonic() + timeout
+        with self.cond:
+            self.draining = True
+            while self.pending or self.busy:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                if tick:
+                    tick()
+                self.cond.wait(min(remaining, 1.0))
+        return True
+
+    def _enqueue(self, fn, user_id, team_id, name):
+        if self.draining:
+            jobs_rejected.inc(command=name)
+            raise QueueFull("Job queue is shutting down")
+        if len(self.pending) >= self.max_depth:
+            jobs_rejected.inc(command=name)
+            raise QueueFull(f"Job queue is full ({self.max_depth} waiting)")
+
+        job = Job(fn, user_id, team_id, name)
+        self.pending.append(job)
+        queue_depth.set(len(self.pending))
+        return job
+
+    def _eligible(self, job):
+        if self.active_users[job.user_id] >= self.per_user:
+            return False
+        if job.team_id and self.active_teams[job.team_id] >= self.per_workspace:
+            return False
+        return True
+
+    def _position(self, job):
+        idle = self.workers - self.busy
+        ahead = 0
+        for other in self.pending:
+            if other is job:
+                break
+            ahead += 1
+
+        if self._eligible(job) and ahead < idle:
+            return 0
+        return ahead + 1
+
+    def _take(self):
+        if self.busy >= self.workers:
+            return None
+
+        for i, job in enumerate(self.pending):
+            if self._eligible(job):
+                del self.pending[i]
+                self.busy += 1
+                self.active_users[job.user_id] += 1
+                if job.team_id:
+                    self.active_teams[job.team_id] += 1
+                queue_depth.set(len(self.pending))
+                jobs_running.set(self.busy)
+                job_wait_seconds.observe(time.monotonic() - job.enqueued_at, command=job.name)
+                return job
+        return None
+
+    def _finish(self, job, started):
+        job_service_seconds.observe(time.monotonic() - started, command=job.name)
+        self.busy -= 1
+        self.active_users[job.user_id] -= 1
+        if job.team_id:
+            self.active_teams[job.team_id] -= 1
+        jobs_running.set(self.busy)
+
+    def _work(self):
+        while True:
+            with self.cond:
+                job = self._take()
+                while job is None:
+                    self.cond.wait()
+                    job = self._take()
+
+            started = time.monotonic()
+            try:
+                job.fn()
+            except Exception as e:
+                print(f"Error in {job.name} job: {str(e)}")
+            finally:
+                with self.cond:
+                    self._finish(job, started)
+                    self.cond.notify_all()
+
+class AsyncJobQueue(JobQueue):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.cond = None
+        self.tasks = []
+
+    async def submit(self, fn, user_id, team_id=None, name="job"):
+        if self.cond is None:
+            self.cond = asyncio.Condition()
+
+        async with self.cond:
+            job = self._enqueue(fn, user_id, team_id, name)
+            if not self.started:
+                self.started = True
+                self.tasks = [asyncio.create_task(self._work()) for i in range(self.workers)]
+            self.cond.notify_all()
+            return self._position(job)
+
+    async def _work(self):
+        while True:
+            async with self.cond:
+                job = self._take()
+                while job is None:
+                    await self.cond.wait()
+                    job = self._take()
+
+            started = time.monotonic()
+            try:
+                await job.fn()
+            except Exception as e:
+                print(f"Error in {job.name} job: {str(e)}")
+            finally:
+                async with self.cond:
+                    self._finish(job, started)
+                    self.cond.notify_all()
+
+job_queue = JobQueue()
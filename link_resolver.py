@@ -0,0 +1,121 @@
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from cachetools import TTLCache
+import metrics
+
+LINK_CACHE_SIZE = int(os.environ.get("LINK_CACHE_SIZE", 1000))
+LINK_CACHE_TTL = float(os.environ.get("LINK_CACHE_TTL", 300))
+LINK_RESOLVE_WORKERS = int(os.environ.get("LINK_RESOLVE_WORKERS", 8))
+
+link_lookups = metrics.counter("translator_link_lookups_total", "Slack message link lookups by result (cache, history, replies, missing)")
+
+resolve_executor = ThreadPoolExecutor(max_workers=LINK_RESOLVE_WORKERS, thread_name_prefix="link-resolver")
+
+def history_params(channel_id, ts, thread_ts):
+    if thread_ts and thread_ts != ts:
+        # Slack puts the thread parent first, so the reply itself is the second message
+        return "replies", {"channel": channel_id, "ts": thread_ts, "latest": ts, "oldest": ts, "inclusive": True, "limit": 2}
+    return "history", {"channel": channel_id, "latest": ts, "limit": 1, "inclusive": True}
+
+def pick_message(result, ts):
+    messages = result["messages"]
+    for message in messages:
+        if message.get("ts") == ts:
+            return message.get("text", "")
+    # Anything else is a different message, e.g. the one before a deleted one
+    return None
+
+class LinkResolver:
+    def __init__(self, max_entries=LINK_CACHE_SIZE, ttl=LINK_CACHE_TTL):
+        self.cache = TTLCache(maxsize=max_entries, ttl=ttl)
+        self.lock = threading.Lock()
+
+    def cached(self, channel_id, ts):
+        with self.lock:
+            return self.cache.get((channel_id, ts))
+
+    def remember(self, channel_id, ts, text):
+        with self.lock:
+            self.cache[(channel_id, ts)] = text
+
+    def invalidate(self, channel_id, ts):
+        with self.lock:
+            self.cache.pop((channel_id, ts), None)
+
+    def fetch(self, client, channel_id, ts, thread_ts=None):
+        text = self.cached(channel_id, ts)
+        if text is not None:
+            link_lookups.inc(result="cache")
+            return text
+
+        source, params = history_params(channel_id, ts, thread_ts)
+        try:
+            if source == "replies":
+                result = client.conversations_replies(**params)
+            else:
+                result = client.conversations_history(**params)
+            text = pick_message(result, ts)
+        except Exception as e:
+            print(f"Error fetching message: {e}")
+            return None
+
+        if not text:
+            link_lookups.inc(result="missing")
+            return None
+
+        link_lookups.inc(result=source)
+        self.remember(channel_id, ts, text)
+        return text
+
+    async def afetch(self, client, channel_id, ts, thread_ts=None):
+        text = self.cached(channel_id, ts)
+        if text is not None:
+            link_lookups.inc(result="cache")
+            return text
+
+        source, params = history_params(channel_id, ts, thread_ts)
+        try:
+            if source == "replies":
+                result = await client.conversations_replies(**params)
+            else:
+                result = await client.conversations_history(**params)
+            text = pick_message(result, ts)
+        except Exception as e:
+            print(f"Error fetching message: {e}")
+            return None
+
+        if not text:
+            link_lookups.inc(result="missing")
+            return None
+
+        link_lookups.inc(result=source)
+        self.remember(channel_id, ts, text)
+        return text
+
+    def resolve(self, client, links):
+        if len(links) == 1:
+            texts = [self.fetch(client, *links[0])]
+        else:
+            texts = list(resolve_executor.map(lambda link: self.fetch(client, *link), links))
+
+        if not texts or any(text is None for text in texts):
+            return None
+        return "\n\n".join(texts)
+
+    async def aresolve(self, client, links):
+        texts = await asyncio.gather(*(self.afetch(client, *link) for link in links))
+
+        if not texts or any(text is None for text in texts):
+            return None
+        return "\n\n".join(texts)
+
+    def handle_event(self, event):
+        channel_id = event.get("channel")
+        if event.get("subtype") == "message_changed":
+            self.invalidate(channel_id, event.get("message", {}).get("ts"))
+        elif event.get("subtype") == "message_deleted":
+            self.invalidate(channel_id, event.get("deleted_ts"))
+
+link_resolver = LinkResolver()
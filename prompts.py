@@ -0,0 +1,185 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from chunking import split_text
+
+DEFAULT_MODEL = "gemini-2.0-flash-lite"
+DEFAULT_MAX_OUTPUT_TOKENS = 150
+FALLBACK_MODELS = [model.strip() for model in os.environ.get("GEMINI_FALLBACK_MODELS", "gemini-2.0-flash").split(",") if model.strip()]
+PROMPTS_FILE = os.environ.get("PROMPTS_FILE")
+PROMPTS_RELOAD_INTERVAL = float(os.environ.get("PROMPTS_RELOAD_INTERVAL", 5))
+# Inputs longer than this are translated in pieces and merged, for modes that have a reduce template
+CHUNK_CHARS = int(os.environ.get("CHUNK_CHARS", 3000))
+CHUNK_PARALLELISM = int(os.environ.get("CHUNK_PARALLELISM", 4))
+
+CORPORATE_TEMPLATE = """
+Take this simple, first-person statement and rewrite it as an overly formal, verbose, and absurdly inflated corporate message spoken from the "I" perspective. 
+Use excessive business jargon and buzzwords like "strategic alignment," "synergy," "value-add," "ideation bandwidth," and "paradigm shifts." 
+Maintain the original meaning and the use of "I" pronouns, parodying the style of executives but keeping it first-person singular. 
+Only output the transformed sentence, no explanations or formatting.
+
+Original: {user_input}
+"""
+
+CASUAL_TEMPLATE = """
+Rewrite the following overly formal, jargon‑heavy corporate message (spoken from the "we" perspective) into a longer, plain‑English statement—about 25-40 words—from the same "we" point of view.
+
+• Strip out buzzwords such as "strategic alignment," "synergy," "value‑add," "ideation bandwidth," and "paradigms."  
+• Preserve the core meaning and keep the pronoun "we."  
+• Output only the rewritten text—no extra commentary or formatting.
+
+Original: {user_input}
+"""
+
+REAL_TEMPLATE = """
+Take the following overly formal, jargon-filled corporate message and translate it into what the company is really trying to say. Here is the messsage: {user_input}. Strip away all business buzzwords, vague language, and PR spin. 
+Be blunt, honest, realistic and cynical — but stay true to the actual meaning and tone. 
+Focus on what leadership is *actually* saying or implying, especially if it's about making money or greed, pushing work onto employees unfairly or suggesting unpaid overtime, or protecting the company's image while disregarding the ethics. Make it all about the company so that it paints them as someone who is selfish.
+Keep it short and direct. Only output the real meaning — no explanations or formatting.
+"""
+
+CASUAL_REDUCE_TEMPLATE = """
+The following are plain-English rewrites of consecutive parts of one long corporate message, in order. Merge them into a single plain-English statement of the whole message—about 40-80 words—from the "we" point of view.
+
+• Keep the points that matter most and drop repetition.
+• Output only the merged text—no extra commentary or formatting.
+
+{user_input}
+"""
+
+REAL_REDUCE_TEMPLATE = """
+The following are blunt translations of consecutive parts of one long corporate message, in order. Combine them into one statement of what the company is really saying overall.
+Be blunt, honest and cynical, keep the most telling points and drop repetition.
+Keep it short and direct. Only output the real meaning — no explanations or formatting.
+
+{user_input}
+"""
+
+EMAIL_TEMPLATE = """
+Convert the following response into an email format
+• Output only the rewritten text—no extra commentary or formatting.
+Response: {user_input}
+"""
+
+class PromptMode:
+    def __init__(self, name, index, template, version="1", model=DEFAULT_MODEL, max_output_tokens=DEFAULT_MAX_OUTPUT_TOKENS, models=None,
+                 reduce_template=None, chunk_chars=CHUNK_CHARS, chunk_parallelism=CHUNK_PARALLELISM, chunk_max_output_tokens=None, reduce_max_output_tokens=None):
+        self.name = name
+        self.index = index
+        self.template = template
+        self.version = str(version)
+        self.model = model
+        self.max_output_tokens = max_output_tokens
+        self.models = list(models) if models else [model] + [fallback for fallback in FALLBACK_MODELS if fallback != model]
+        self.reduce_template = reduce_template
+        self.chunk_chars = chunk_chars
+        self.chunk_parallelism = max(1, chunk_parallelism)
+        self.chunk_max_output_tokens = chunk_max_output_tokens or max_output_tokens
+        self.reduce_max_output_tokens = reduce_max_output_tokens or max_output_tokens
+        # Cached responses outlive a PROMPTS_FILE edit, so a changed prompt must not need a version bump to miss them
+        settings = json.dumps([self.template, self.reduce_template, self.model, self.max_output_tokens, self.chunk_chars,
+                               self.chunk_max_output_tokens, self.reduce_max_output_tokens])
+        self.fingerprint = hashlib.sha256(settings.encode("utf-8")).hexdigest()[:12]
+
+    @property
+    def key(self):
+        return f"{self.name}@{self.version}:{self.fingerprint}"
+
+    def render(self, user_input):
+        return self.template.replace("{user_input}", user_input)
+
+    def chunks(self, user_input):
+        if not self.reduce_template:
+            return [user_input]
+        return split_text(user_input, self.chunk_chars)
+
+    def render_reduce(self, parts):
+        numbered = "\n\n".join(f"Part {i}: {part.strip()}" for i, part in enumerate(parts, 1))
+        return self.reduce_template.replace("{user_input}", numbered)
+
+DEFAULT_MODES = [
+    PromptMode("corporate", 0, CORPORATE_TEMPLATE),
+    PromptMode("casual", 1, CASUAL_TEMPLATE, reduce_template=CASUAL_REDUCE_TEMPLATE, reduce_max_output_tokens=250),
+    PromptMode("real", 2, REAL_TEMPLATE, reduce_template=REAL_REDUCE_TEMPLATE, reduce_max_output_tokens=250),
+    PromptMode("email", 3, EMAIL_TEMPLATE)
+]
+
+class PromptRegistry:
+    def __init__(self, modes, path=None, reload_interval=PROMPTS_RELOAD_INTERVAL):
+        self.defaults = {mode.name: mode for mode in modes}
+        self.path = path
+        self.reload_interval = reload_interval
+        self.modes = dict(self.defaults)
+        self.by_index = {mode.index: mode for mode in modes}
+        self.loaded_mtime = None
+        self.checked_at = 0
+        self.lock = threading.Lock()
+        self.reload()
+
+    def reload(self):
+        if not self.path:
+            return
+
+        try:
+            mtime = os.path.getmtime(self.path)
+            if mtime == self.loaded_mtime:
+                return
+            with open(self.path, encoding="utf-8") as f:
+                overrides = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Error loading prompts from {self.path}: {str(e)}")
+            return
+
+        modes = dict(self.defaults)
+        for name, config in overrides.items():
+            base = modes.get(name)
+            model = config.get("model", base.model if base else DEFAULT_MODEL)
+            index = config.get("index", base.index if base else None)
+            modes[name] = PromptMode(
+                name,
+                index,
+                config.get("template", base.template if base else ""),
+                version=config.get("version", base.version if base else "1"),
+                model=model,
+                max_output_tokens=config.get("max_output_tokens", base.max_output_tokens if base else DEFAULT_MAX_OUTPUT_TOKENS),
+                models=config.get("models", base.models if base and "model" not in config else None),
+                reduce_template=config.get("reduce_template", base.reduce_template if base else None),
+                chunk_chars=config.get("chunk_chars", base.chunk_chars if base else CHUNK_CHARS),
+                chunk_parallelism=config.get("chunk_parallelism", base.chunk_parallelism if base else CHUNK_PARALLELISM),
+                chunk_max_output_tokens=config.get("chunk_max_output_tokens", base.chunk_max_output_tokens if base and "max_output_tokens" not in config else None),
+                reduce_max_output_tokens=config.get("reduce_max_output_tokens", base.reduce_max_output_tokens if base and "max_output_tokens" not in config else None)
+            )
+
+        with self.lock:
+            self.modes = modes
+            self.by_index = {mode.index: mode for mode in modes.values() if mode.index is not None}
+            self.loaded_mtime = mtime
+
+    def maybe_reload(self):
+        now = time.monotonic()
+        if not self.path or now - self.checked_at < self.reload_interval:
+            return
+        self.checked_at = now
+        self.reload()
+
+    def get(self, mode):
+        self.maybe_reload()
+
+        with self.lock:
+            if isinstance(mode, PromptMode):
+                return mode
+            if isinstance(mode, int) or (isinstance(mode, str) and mode.isdigit()):
+                found = self.by_index.get(int(mode))
+            else:
+                found = self.modes.get(mode)
+
+        if found is None:
+            raise Exception(f"Invalid mode: {mode}")
+        return found
+
+registry = PromptRegistry(DEFAULT_MODES, path=PROMPTS_FILE)
+
+def get_mode(mode):
+    return registry.get(mode)
@@ -0,0 +1,198 @@
+import atexit
+import os
+import sqlite3
+import threading
+import time
+from collections import Counter
+from cachetools import TTLCache
+from rate_limit import TokenBucket
+from prompts import get_mode
+from slack_helpers import extract_message_links
+import metrics
+
+# Budgets per scope: requests per minute and estimated Gemini tokens per hour, 0 turns a limit off
+QUOTA_USER_REQUESTS = float(os.environ.get("QUOTA_USER_REQUESTS", 6))
+QUOTA_CHANNEL_REQUESTS = float(os.environ.get("QUOTA_CHANNEL_REQUESTS", 20))
+QUOTA_WORKSPACE_REQUESTS = float(os.environ.get("QUOTA_WORKSPACE_REQUESTS", 60))
+QUOTA_USER_TOKENS = float(os.environ.get("QUOTA_USER_TOKENS", 20000))
+QUOTA_CHANNEL_TOKENS = float(os.environ.get("QUOTA_CHANNEL_TOKENS", 60000))
+QUOTA_WORKSPACE_TOKENS = float(os.environ.get("QUOTA_WORKSPACE_TOKENS", 200000))
+QUOTA_MAX_KEYS = int(os.environ.get("QUOTA_MAX_KEYS", 10000))
+QUOTA_LINK_TOKENS = int(os.environ.get("QUOTA_LINK_TOKENS", 500))
+QUOTA_USAGE_DB = os.environ.get("QUOTA_USAGE_DB", "usage.db")
+QUOTA_FLUSH_INTERVAL = float(os.environ.get("QUOTA_FLUSH_INTERVAL", 10))
+
+CHARS_PER_TOKEN = 4
+REQUEST_WINDOW = 60
+TOKEN_WINDOW = 3600
+
+quota_rejections = metrics.counter("translator_quota_rejections_total", "Requests refused by the per-user, channel or workspace quota, by scope and budget")
+quota_tokens = metrics.counter("translator_quota_estimated_tokens_total", "Estimated Gemini tokens charged to quotas, by command")
+
+class QuotaExceeded(Exception):
+    def __init__(self, scope, kind, retry_after):
+        super().__init__(f"{scope} {kind} quota exceeded, retry in {retry_after:.0f}s")
+        self.scope = scope
+        self.kind = kind
+        self.retry_after = retry_after
+
+def estimate_tokens(text, modes):
+    # Links are fetched after admission, so each one is charged a flat estimate instead of its text
+    links = len(extract_message_links(text)) if "slack.com/archives/" in text else 0
+    if links:
+        text = ""
+
+    tokens = 0
+    for mode in modes:
+        prompt_mode = get_mode(mode)
+        chunks = prompt_mode.chunks(text)
+        if len(chunks) > 1:
+            # One call per chunk plus a reduce call that reads all of their outputs
+            outputs = len(chunks) * prompt_mode.chunk_max_output_tokens
+            tokens += sum(len(prompt_mode.render(chunk)) // CHARS_PER_TOKEN + prompt_mode.chunk_max_output_tokens for chunk in chunks)
+            tokens += len(prompt_mode.reduce_template) // CHARS_PER_TOKEN + outputs + prompt_mode.reduce_max_output_tokens
+        else:
+            tokens += len(prompt_mode.render(text)) // CHARS_PER_TOKEN + links * QUOTA_LINK_TOKENS + prompt_mode.max_output_tokens
+    return tokens
+
+class UsageStore:
+    def __init__(self, db_path=QUOTA_USAGE_DB, flush_interval=QUOTA_FLUSH_INTERVAL):
+        self.db_path = db_path
+        self.flush_interval = flush_interval
+        self.pending = Counter()
+        self.flushed_at = time.monotonic()
+        self.lock = threading.Lock()
+        self.db = None
+
+    def reconnect(self):
+        # The database is opened on first use, so importing the bot never creates it
+        with self.lock:
+            self.db = None
+
+    def connection(self):
+        if self.db is None and self.db_path:
+            self.db = sqlite3.connect(self.db_path, check_same_thread=False)
+            self.db.execute("CREATE TABLE IF NOT EXISTS usage (day TEXT, scope TEXT, key TEXT, requests INTEGER DEFAULT 0, tokens INTEGER DEFAULT 0, rejected INTEGER DEFAULT 0, PRIMARY KEY (day, scope, key))")
+            self.db.commit()
+        return self.db
+
+    def record(self, scope, key, requests=0, tokens=0, rejected=0):
+        day = time.strftime("%Y-%m-%d", time.gmtime())
+        with self.lock:
+            self.pending[(day, scope, key, "requests")] += requests
+            self.pending[(day, scope, key, "tokens")] += tokens
+            self.pending[(day, scope, key, "rejected")] += rejected
+            if time.monotonic() - self.flushed_at >= self.flush_interval:
+                self._flush()
+
+    def usage(self, scope, key, day=None):
+        day = day or time.strftime("%Y-%m-%d", time.gmtime())
+        fields = ("requests", "tokens", "rejected")
+
+        with self.lock:
+            totals = {field: self.pending.get((day, scope, key, field), 0) for field in fields}
+            db = self.connection()
+            if db is not None:
+                row = db.execute("SELECT requests, tokens, rejected FROM usage WHERE day = ? AND scope = ? AND key = ?", (day, scope, key)).fetchone()
+                if row:
+                    for field, value in zip(fields, row):
+                        totals[field] += value
+        return totals
+
+    def flush(self):
+        with self.lock:
+            self._flush()
+
+    def _flush(self):
+        self.flushed_at = time.monotonic()
+        if not self.db_path or not any(self.pending.values()):
+            return
+
+        rows, self.pending = self.pending, Counter()
+
+        try:
+            db = self.connection()
+            for (day, scope, key, field), value in rows.items():
+                if value:
+                    db.execute(f"INSERT INTO usage (day, scope, key, {field}) VALUES (?, ?, ?, ?) ON CONFLICT (day, scope, key) DO UPDATE SET {field} = {field} + excluded.{field}", (day, scope, key, value))
+            db.commit()
+        except sqlite3.Error as e:
+            print(f"Error writing quota usage: {str(e)}")
+            self.pending.update(rows)
+
+class QuotaLimiter:
+    def __init__(self, usage, budgets=None, max_keys=QUOTA_MAX_KEYS):
+        self.usage = usage
+        self.budgets = budgets if budgets is not None else {
+            ("user", "requests"): (QUOTA_USER_REQUESTS, REQUEST_WINDOW),
+            ("channel", "requests"): (QUOTA_CHANNEL_REQUESTS, REQUEST_WINDOW),
+            ("workspace", "requests"): (QUOTA_WORKSPACE_REQUESTS, REQUEST_WINDOW),
+            ("user", "tokens"): (QUOTA_USER_TOKENS, TOKEN_WINDOW),
+            ("channel", "tokens"): (QUOTA_CHANNEL_TOKENS, TOKEN_WINDOW),
+            ("workspace", "tokens"): (QUOTA_WORKSPACE_TOKENS, TOKEN_WINDOW)
+        }
+        # An idle bucket refills completely within its window, so forgetting it after that loses nothing
+        self.buckets = TTLCache(maxsize=max_keys, ttl=max([window for amount, window in self.budgets.values()], default=TOKEN_WINDOW))
+        self.lock = threading.Lock()
+
+    def bucket(self, scope, kind, key):
+        bucket = self.buckets.get((scope, kind, key))
+        if bucket is None:
+            amount, window = self.budgets[(scope, kind)]
+            bucket = TokenBucket(amount / window, capacity=amount)
+        # Storing it again restarts the TTL, so only idle buckets expire
+        self.buckets[(scope, kind, key)] = bucket
+        return bucket
+
+    def charge(self, user_id, channel_id, team_id, tokens, name="request"):
+        keys = {"user": user_id, "channel": channel_id, "workspace": team_id}
+        costs = {"requests": 1, "tokens": tokens}
+        wanted = []
+
+        with self.lock:
+            for (scope, kind), (amount, window) in self.budgets.items():
+                if amount <= 0 or not keys[scope]:
+                    continue
+                # Anything bigger than a whole budget drains it rather than waiting forever
+                cost = min(costs[kind], amount)
+                bucket = self.bucket(scope, kind, keys[scope])
+                wait = bucket.wait_time(cost)
+                if wait > 0:
+                    quota_rejections.inc(scope=scope, kind=kind)
+                    self.usage.record(scope, keys[scope], rejected=1)
+                    raise QuotaExceeded(scope, kind, wait)
+                wanted.append((bucket, cost))
+
+            for bucket, cost in wanted:
+                bucket.try_acquire(cost)
+
+        quota_tokens.inc(tokens, command=name)
+        for scope, key in keys.items():
+            if key:
+                self.usage.record(scope, key, requests=1, tokens=tokens)
+
+    def refund(self, user_id, channel_id, team_id, tokens):
+        # Gives a charge back when the request was turned away after all, e.g. by a full job queue
+        keys = {"user": user_id, "channel": channel_id, "workspace": team_id}
+        costs = {"requests": 1, "tokens": tokens}
+
+        with self.lock:
+            for (scope, kind), (amount, window) in self.budgets.items():
+                if amount <= 0 or not keys[scope]:
+                    continue
+                self.bucket(scope, kind, keys[scope]).release(min(costs[kind], amount))
+
+        for scope, key in keys.items():
+            if key:
+                self.usage.record(scope, key, requests=-1, tokens=-tokens)
+
+usage_store = UsageStore()
+quota = QuotaLimiter(usage_store)
+
+atexit.register(usage_store.flush)
+
+def slow_down_message(error):
+    whose = {"user": "your", "channel": "this channel's", "workspace": "your workspace's"}[error.scope]
+    wait = max(1, int(error.retry_after + 0.999))
+    when = f"{wait} seconds" if wait < 120 else f"{(wait + 59) // 60} minutes"
+    return f"🐢 Easy there! You've used up {whose} translations for now - your boss can wait, try again in {when}."
@@ -0,0 +1,62 @@
+import threading
+import time
+
+class TokenBucket:
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0
+        self.lock = threading.Lock()
+
+    def _refill(self, now):
+        if now > self.updated:
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+
+    def try_acquire(self, tokens=1):
+        with self.lock:
+            now = time.monotonic()
+            self._refill(now)
+            if now < self.paused_until or self.tokens < tokens:
+                return False
+            self.tokens -= tokens
+            return True
+
+    def wait_time(self, tokens=1):
+        with self.lock:
+            now = time.monotonic()
+            self._refill(now)
+            wait = max(0, self.paused_until - now)
+            if self.tokens < tokens:
+                wait = max(wait, (tokens - self.tokens) / self.rate)
+            return wait
+
+    def acquire(self, tokens=1):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self._refill(now)
+                if now >= self.paused_until and self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return
+                wait = max(self.paused_until - now, (tokens - self.tokens) / self.rate)
+            time.sleep(max(wait, 0.001))
+
+    def release(self, tokens=1):
+        with self.lock:
+            self.tokens = min(self.capacity, self.tokens + tokens)
+
+    def pause(self, seconds):
+        with self.lock:
+            now = time.monotonic()
+            self.paused_until = max(self.paused_until, now + seconds)
+            self.tokens = 0
+            self.updated = max(now, self.paused_until)
+
+    def available(self):
+        with self.lock:
+            now = time.monotonic()
+            self._refill(now)
+            return 0 if now < self.paused_until else self.tokens
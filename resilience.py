@@ -0,0 +1,113 @@
+import os
+import threading
+import time
+from tenacity import Retrying, AsyncRetrying, stop_after_attempt, stop_after_delay, wait_random_exponential, retry_if_exception
+import metrics
+
+GEMINI_FIRST_CHUNK_TIMEOUT = float(os.environ.get("GEMINI_FIRST_CHUNK_TIMEOUT", 15))
+GEMINI_DEADLINE = float(os.environ.get("GEMINI_DEADLINE", 45))
+GEMINI_MAX_RETRIES = int(os.environ.get("GEMINI_MAX_RETRIES", 2))
+GEMINI_RETRY_BASE = float(os.environ.get("GEMINI_RETRY_BASE", 0.5))
+GEMINI_RETRY_MAX = float(os.environ.get("GEMINI_RETRY_MAX", 4))
+CIRCUIT_FAILURE_THRESHOLD = int(os.environ.get("CIRCUIT_FAILURE_THRESHOLD", 5))
+CIRCUIT_RESET_TIMEOUT = float(os.environ.get("CIRCUIT_RESET_TIMEOUT", 30))
+
+RETRYABLE_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+retries = metrics.counter("translator_gemini_retries_total", "Gemini calls retried after a retryable error, by model")
+circuit_state = metrics.gauge("translator_circuit_open", "1 while a model's circuit breaker is open or half open")
+circuit_rejections = metrics.counter("translator_circuit_rejections_total", "Calls refused without trying because the circuit was open")
+
+class UpstreamUnavailable(Exception):
+    pass
+
+class UpstreamTimeout(Exception):
+    pass
+
+def is_retryable(error):
+    import httpx
+    from google.genai import errors
+
+    if isinstance(error, errors.APIError):
+        return error.code in RETRYABLE_STATUS_CODES
+    return isinstance(error, (httpx.TransportError, ConnectionError, TimeoutError))
+
+def log_retry(model):
+    def before_sleep(retry_state):
+        retries.inc(model=model)
+        print(f"Retrying {model} after error: {str(retry_state.outcome.exception())}")
+    return before_sleep
+
+def retrying(model, cancelled=None):
+    stop = stop_after_attempt(GEMINI_MAX_RETRIES + 1) | stop_after_delay(GEMINI_FIRST_CHUNK_TIMEOUT)
+    if cancelled is not None:
+        stop = stop | (lambda retry_state: cancelled.is_set())
+    return Retrying(
+        stop=stop,
+        wait=wait_random_exponential(multiplier=GEMINI_RETRY_BASE, max=GEMINI_RETRY_MAX),
+        retry=retry_if_exception(is_retryable),
+        before_sleep=log_retry(model),
+        reraise=True
+    )
+
+def async_retrying(model):
+    return AsyncRetrying(
+        stop=stop_after_attempt(GEMINI_MAX_RETRIES + 1) | stop_after_delay(GEMINI_FIRST_CHUNK_TIMEOUT),
+        wait=wait_random_exponential(multiplier=GEMINI_RETRY_BASE, max=GEMINI_RETRY_MAX),
+        retry=retry_if_exception(is_retryable),
+        before_sleep=log_retry(model),
+        reraise=True
+    )
+
+class CircuitBreaker:
+    def __init__(self, name, failure_threshold=CIRCUIT_FAILURE_THRESHOLD, reset_timeout=CIRCUIT_RESET_TIMEOUT):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0
+        self.trial_running = False
+        self.lock = threading.Lock()
+
+    def allow(self):
+        with self.lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = HALF_OPEN
+                self.trial_running = False
+            if self.state == HALF_OPEN and not self.trial_running:
+                self.trial_running = True
+                return True
+
+        circuit_rejections.inc(model=self.name)
+        return False
+
+    def release_trial(self):
+        # A trial call that was cancelled says nothing about the model, so let the next call try instead
+        with self.lock:
+            if self.state == HALF_OPEN:
+                self.trial_running = False
+
+    def record_success(self):
+        with self.lock:
+            self.state = CLOSED
+            self.failures = 0
+            self.trial_running = False
+        circuit_state.set(0, model=self.name)
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != OPEN:
+                    print(f"Circuit for {self.name} opened after {self.failures} failures")
+                self.state = OPEN
+                self.opened_at = time.monotonic()
+                self.trial_running = False
+        circuit_state.set(0 if self.state == CLOSED else 1, model=self.name)
@@ -0,0 +1,128 @@
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+import metrics
+
+cache_lookups = metrics.counter("translator_cache_lookups_total", "Response cache lookups by result (hit, disk_hit, miss)")
+cache_removals = metrics.counter("translator_cache_removals_total", "Response cache entries dropped, by reason (evicted, expired)")
+cache_entries = metrics.gauge("translator_cache_entries", "Responses held in the in-memory cache")
+cache_bytes = metrics.gauge("translator_cache_bytes", "Bytes of responses held in the in-memory cache")
+
+def normalize_input(text):
+    return re.sub(r"\s+", " ", text).strip()
+
+def make_key(mode, user_input, model):
+    raw = f"{mode}\0{model}\0{normalize_input(user_input)}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+class ResponseCache:
+    def __init__(self, max_entries=1024, max_bytes=4 * 1024 * 1024, ttl=3600, db_path=None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.size = 0
+        self.lock = threading.Lock()
+        self.db_path = db_path
+        self.db = None
+        self.reconnect()
+
+    def reconnect(self):
+        if not self.db_path:
+            return
+
+        self.db = sqlite3.connect(self.db_path, check_same_thread=False)
+        self.db.execute("CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, value TEXT, created REAL)")
+        self.db.commit()
+
+    def get(self, key):
+        now = time.time()
+
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                value, created = entry
+                if now - created < self.ttl:
+                    self.entries.move_to_end(key)
+                    cache_lookups.inc(result="hit")
+                    return value
+                self._remove(key)
+                cache_removals.inc(reason="expired")
+
+            value = self._get_from_disk(key, now)
+            if value is not None:
+                cache_lookups.inc(result="disk_hit")
+                return value
+
+            cache_lookups.inc(result="miss")
+            return None
+
+    def set(self, key, value):
+        now = time.time()
+        value_size = len(value.encode("utf-8"))
+        if value_size > self.max_bytes:
+            return
+
+        with self.lock:
+            self._store(key, value, now)
+
+            if self.db is not None:
+                try:
+                    self.db.execute("INSERT OR REPLACE INTO responses (key, value, created) VALUES (?, ?, ?)", (key, value, now))
+                    self.db.commit()
+                except sqlite3.Error as e:
+                    print(f"Error writing response cache: {str(e)}")
+
+    def _get_from_disk(self, key, now):
+        if self.db is None:
+            return None
+
+        try:
+            row = self.db.execute("SELECT value, created FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+
+            value, created = row
+            if now - created >= self.ttl:
+                self.db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self.db.commit()
+                cache_removals.inc(reason="expired")
+                return None
+        except sqlite3.Error as e:
+            print(f"Error reading response cache: {str(e)}")
+            return None
+
+        self._store(key, value, created)
+        return value
+
+    def _store(self, key, value, created):
+        if key in self.entries:
+            self._remove(key)
+
+        self.entries[key] = (value, created)
+        self.size += len(value.encode("utf-8"))
+
+        while len(self.entries) > self.max_entries or self.size > self.max_bytes:
+            oldest_key = next(iter(self.entries))
+            self._remove(oldest_key)
+            cache_removals.inc(reason="evicted")
+        self._publish()
+
+    def _remove(self, key):
+        value, created = self.entries.pop(key)
+        self.size -= len(value.encode("utf-8"))
+
+    def _publish(self):
+        cache_entries.set(len(self.entries))
+        cache_bytes.set(self.size)
+
+response_cache = ResponseCache(
+    max_entries=int(os.environ.get("TRANSLATOR_CACHE_SIZE", 1024)),
+    max_bytes=int(os.environ.get("TRANSLATOR_CACHE_BYTES", 4 * 1024 * 1024)),
+    ttl=float(os.environ.get("TRANSLATOR_CACHE_TTL", 3600)),
+    db_path=os.environ.get("TRANSLATOR_CACHE_DB")
+)
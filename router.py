@@ -0,0 +1,370 @@
+import asyncio
+import os
+import queue
+import threading
+import time
+from collections import deque
+from gemini_client import get_client
+from resilience import CircuitBreaker, UpstreamUnavailable, UpstreamTimeout, retrying, async_retrying, GEMINI_FIRST_CHUNK_TIMEOUT, GEMINI_DEADLINE
+import metrics
+
+ROUTER_WINDOW = int(os.environ.get("ROUTER_WINDOW", 100))
+ROUTER_MIN_SAMPLES = int(os.environ.get("ROUTER_MIN_SAMPLES", 10))
+ROUTER_MAX_ERROR_RATE = float(os.environ.get("ROUTER_MAX_ERROR_RATE", 0.5))
+ROUTER_HEDGING = os.environ.get("ROUTER_HEDGING", "true").lower() == "true"
+ROUTER_HEDGE_AFTER = float(os.environ.get("ROUTER_HEDGE_AFTER", 2.0))
+
+route_selected = metrics.counter("translator_route_selected_total", "Backend that produced the response, by mode")
+route_errors = metrics.counter("translator_route_errors_total", "Backend failures before the first chunk, by mode and model")
+route_hedges = metrics.counter("translator_route_hedges_total", "Hedged second requests started because the first was slow")
+route_fallbacks = metrics.counter("translator_route_fallbacks_total", "Requests retried on the next backend after an error")
+backend_first_chunk_seconds = metrics.histogram("translator_backend_first_chunk_seconds", "Time to first chunk per backend model")
+backend_p50 = metrics.gauge("translator_backend_p50_seconds", "Rolling p50 time to first chunk per backend model")
+backend_p95 = metrics.gauge("translator_backend_p95_seconds", "Rolling p95 time to first chunk per backend model")
+backend_error_rate = metrics.gauge("translator_backend_error_rate", "Rolling error rate per backend model")
+gemini_tokens = metrics.counter("translator_gemini_tokens_total", "Gemini tokens used, by model and kind (prompt, output)")
+
+def record_usage(model, usage):
+    if usage is None:
+        return
+    gemini_tokens.inc(usage.prompt_token_count or 0, model=model, kind="prompt")
+    gemini_tokens.inc(usage.candidates_token_count or 0, model=model, kind="output")
+
+def gemini_backend(model, contents, config):
+    usage = None
+    for chunk in get_client().models.generate_content_stream(model=model, contents=contents, config=config):
+        usage = chunk.usage_metadata or usage
+        if chunk.text:
+            yield chunk.text
+    record_usage(model, usage)
+
+async def gemini_async_backend(model, contents, config):
+    usage = None
+    async for chunk in await get_client().aio.models.generate_content_stream(model=model, contents=contents, config=config):
+        usage = chunk.usage_metadata or usage
+        if chunk.text:
+            yield chunk.text
+    record_usage(model, usage)
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+class BackendStats:
+    def __init__(self, model, window=ROUTER_WINDOW):
+        self.model = model
+        self.latencies = deque(maxlen=window)
+        self.outcomes = deque(maxlen=window)
+        self.lock = threading.Lock()
+
+    def record_success(self, latency):
+        with self.lock:
+            self.latencies.append(latency)
+            self.outcomes.append(True)
+        backend_first_chunk_seconds.observe(latency, model=self.model)
+        self.publish()
+
+    def record_error(self):
+        with self.lock:
+            self.outcomes.append(False)
+        self.publish()
+
+    def samples(self):
+        with self.lock:
+            return len(self.latencies)
+
+    def p50(self):
+        with self.lock:
+            return percentile(self.latencies, 0.5) if self.latencies else None
+
+    def p95(self):
+        with self.lock:
+            return percentile(self.latencies, 0.95) if self.latencies else None
+
+    def error_rate(self):
+        with self.lock:
+            if not self.outcomes:
+                return 0.0
+            return self.outcomes.count(False) / len(self.outcomes)
+
+    def healthy(self):
+        with self.lock:
+            if len(self.outcomes) < ROUTER_MIN_SAMPLES:
+                return True
+        return self.error_rate() <= ROUTER_MAX_ERROR_RATE
+
+    def publish(self):
+        if self.p50() is not None:
+            backend_p50.set(self.p50(), model=self.model)
+            backend_p95.set(self.p95(), model=self.model)
+        backend_error_rate.set(self.error_rate(), model=self.model)
+
+class Router:
+    def __init__(self, backend=gemini_backend, async_backend=gemini_async_backend, hedging=ROUTER_HEDGING, hedge_after=ROUTER_HEDGE_AFTER):
+        self.backend = backend
+        self.async_backend = async_backend
+        self.hedging = hedging
+        self.hedge_after = hedge_after
+        self.stats = {}
+        self.breakers = {}
+        self.lock = threading.Lock()
+
+    def stats_for(self, model):
+        with self.lock:
+            if model not in self.stats:
+                self.stats[model] = BackendStats(model)
+            return self.stats[model]
+
+    def order(self, models):
+        healthy = [model for model in models if self.stats_for(model).healthy()]
+        unhealthy = [model for model in models if model not in healthy]
+
+        if all(self.stats_for(model).samples() >= ROUTER_MIN_SAMPLES for model in healthy):
+            healthy.sort(key=lambda model: self.stats_for(model).p50())
+        return healthy + unhealthy
+
+    def hedge_delay(self, model):
+        stats = self.stats_for(model)
+        if stats.samples() >= ROUTER_MIN_SAMPLES:
+            return stats.p95()
+        return self.hedge_after
+
+    def breaker_for(self, model):
+        with self.lock:
+            if model not in self.breakers:
+                self.breakers[model] = CircuitBreaker(model)
+            return self.breakers[model]
+
+    def next_model(self, order):
+        while order:
+            model = order.pop(0)
+            if self.breaker_for(model).allow():
+                return model
+        return None
+
+    def record_failure(self, model, first_chunk_pending):
+        if first_chunk_pending:
+            self.stats_for(model).record_error()
+        self.breaker_for(model).record_failure()
+
+    def _run_attempt(self, attempt_id, model, contents, config, events, cancelled):
+        started = time.monotonic()
+        first = True
+        try:
+            for attempt in retrying(model, cancelled):
+                with attempt:
+                    chunks = iter(self.backend(model, contents, config))
+                    text = next(chunks, None)
+            if text is None:
+                raise Exception("AI generated an empty response")
+            if cancelled.is_set():
+                self.breaker_for(model).release_trial()
+                return
+
+            first = False
+            self.stats_for(model).record_success(time.monotonic() - started)
+            self.breaker_for(model).record_success()
+            events.put((attempt_id, "chunk", text))
+
+            for text in chunks:
+                if cancelled.is_set():
+                    return
+                events.put((attempt_id, "chunk", text))
+            events.put((attempt_id, "done", None))
+        except Exception as e:
+            if cancelled.is_set():
+                self.breaker_for(model).release_trial()
+            else:
+                self.record_failure(model, first)
+            events.put((attempt_id, "error", e))
+
+    def stream(self, mode_name, models, contents, config, first_chunk_timeout=GEMINI_FIRST_CHUNK_TIMEOUT, deadline=GEMINI_DEADLINE):
+        started = time.monotonic()
+        order = self.order(models)
+        events = queue.Queue()
+        attempts = {}
+        running = set()
+
+        def launch(model):
+            attempt_id = len(attempts)
+            cancelled = threading.Event()
+            attempts[attempt_id] = (model, cancelled)
+            running.add(attempt_id)
+            threading.Thread(
+                target=self._run_attempt,
+                args=(attempt_id, model, contents, config, events, cancelled),
+                daemon=True
+            ).start()
+
+        model = self.next_model(order)
+        if model is None:
+            raise UpstreamUnavailable(f"Every model for {mode_name} is failing, circuit open")
+        launch(model)
+        hedge_at = started + self.hedge_delay(model) if self.hedging else None
+        first_chunk_at = started + first_chunk_timeout
+        winner = None
+
+        try:
+            while winner is None:
+                wake_at = first_chunk_at
+                if hedge_at is not None and order:
+                    wake_at = min(wake_at, hedge_at)
+                try:
+                    attempt_id, kind, payload = events.get(timeout=max(0, wake_at - time.monotonic()))
+                except queue.Empty:
+                    if time.monotonic() >= first_chunk_at:
+                        for attempt_id in running:
+                            self.record_failure(attempts[attempt_id][0], True)
+                        raise UpstreamTimeout(f"No response from {mode_name} models within {first_chunk_timeout:g}s")
+                    hedge_at = None
+                    model = self.next_model(order)
+                    if model is not None:
+                        route_hedges.inc(mode=mode_name)
+                        launch(model)
+                    continue
+
+                if kind == "chunk":
+                    winner = attempt_id
+                    first_chunk = payload
+                elif kind == "error":
+                    running.discard(attempt_id)
+                    route_errors.inc(mode=mode_name, model=attempts[attempt_id][0])
+                    print(f"Backend {attempts[attempt_id][0]} failed: {str(payload)}")
+                    if not running:
+                        model = self.next_model(order)
+                        if model is None:
+                            raise payload
+                        route_fallbacks.inc(mode=mode_name)
+                        launch(model)
+
+            for attempt_id, (model, cancelled) in attempts.items():
+                if attempt_id != winner:
+                    cancelled.set()
+
+            route_selected.inc(mode=mode_name, model=attempts[winner][0])
+            yield first_chunk
+
+            while True:
+                try:
+                    attempt_id, kind, payload = events.get(timeout=max(0, started + deadline - time.monotonic()))
+                except queue.Empty:
+                    self.breaker_for(attempts[winner][0]).record_failure()
+                    raise UpstreamTimeout(f"{attempts[winner][0]} did not finish within {deadline:g}s")
+                if attempt_id != winner:
+                    continue
+                if kind == "chunk":
+                    yield payload
+                elif kind == "done":
+                    return
+                else:
+                    raise payload
+        finally:
+            for model, cancelled in attempts.values():
+                cancelled.set()
+
+    async def _run_async_attempt(self, attempt_id, model, contents, config, events):
+        started = time.monotonic()
+        first = True
+        try:
+            async for attempt in async_retrying(model):
+                with attempt:
+                    chunks = aiter(self.async_backend(model, contents, config))
+                    text = await anext(chunks, None)
+            if text is None:
+                raise Exception("AI generated an empty response")
+
+            first = False
+            self.stats_for(model).record_success(time.monotonic() - started)
+            self.breaker_for(model).record_success()
+            await events.put((attempt_id, "chunk", text))
+
+            async for text in chunks:
+                await events.put((attempt_id, "chunk", text))
+            await events.put((attempt_id, "done", None))
+        except asyncio.CancelledError:
+            self.breaker_for(model).release_trial()
+            raise
+        except Exception as e:
+            self.record_failure(model, first)
+            await events.put((attempt_id, "error", e))
+
+    async def astream(self, mode_name, models, contents, config, first_chunk_timeout=GEMINI_FIRST_CHUNK_TIMEOUT, deadline=GEMINI_DEADLINE):
+        started = time.monotonic()
+        order = self.order(models)
+        events = asyncio.Queue()
+        attempts = {}
+        running = set()
+
+        def launch(model):
+            attempt_id = len(attempts)
+            task = asyncio.create_task(self._run_async_attempt(attempt_id, model, contents, config, events))
+            attempts[attempt_id] = (model, task)
+            running.add(attempt_id)
+
+        model = self.next_model(order)
+        if model is None:
+            raise UpstreamUnavailable(f"Every model for {mode_name} is failing, circuit open")
+        launch(model)
+        hedge_at = started + self.hedge_delay(model) if self.hedging else None
+        first_chunk_at = started + first_chunk_timeout
+        winner = None
+
+        try:
+            while winner is None:
+                wake_at = first_chunk_at
+                if hedge_at is not None and order:
+                    wake_at = min(wake_at, hedge_at)
+                try:
+                    attempt_id, kind, payload = await asyncio.wait_for(events.get(), max(0, wake_at - time.monotonic()))
+                except asyncio.TimeoutError:
+                    if time.monotonic() >= first_chunk_at:
+                        for attempt_id in running:
+                            self.record_failure(attempts[attempt_id][0], True)
+                        raise UpstreamTimeout(f"No response from {mode_name} models within {first_chunk_timeout:g}s")
+                    hedge_at = None
+                    model = self.next_model(order)
+                    if model is not None:
+                        route_hedges.inc(mode=mode_name)
+                        launch(model)
+                    continue
+
+                if kind == "chunk":
+                    winner = attempt_id
+                    first_chunk = payload
+                elif kind == "error":
+                    running.discard(attempt_id)
+                    route_errors.inc(mode=mode_name, model=attempts[attempt_id][0])
+                    print(f"Backend {attempts[attempt_id][0]} failed: {str(payload)}")
+                    if not running:
+                        model = self.next_model(order)
+                        if model is None:
+                            raise payload
+                        route_fallbacks.inc(mode=mode_name)
+                        launch(model)
+
+            for attempt_id, (model, task) in attempts.items():
+                if attempt_id != winner:
+                    task.cancel()
+
+            route_selected.inc(mode=mode_name, model=attempts[winner][0])
+            yield first_chunk
+
+            while True:
+                try:
+                    attempt_id, kind, payload = await asyncio.wait_for(events.get(), max(0, started + deadline - time.monotonic()))
+                except asyncio.TimeoutError:
+                    self.breaker_for(attempts[winner][0]).record_failure()
+                    raise UpstreamTimeout(f"{attempts[winner][0]} did not finish within {deadline:g}s")
+                if attempt_id != winner:
+                    continue
+                if kind == "chunk":
+                    yield payload
+                elif kind == "done":
+                    return
+                else:
+                    raise payload
+        finally:
+            for model, task in attempts.values():
+                task.cancel()
+
+router = Router()
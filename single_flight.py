@@ -0,0 +1,125 @@
+import asyncio
+import threading
+
+class Flight:
+    def __init__(self):
+        self.chunks = []
+        self.done = False
+        self.error = None
+        self.cond = threading.Condition()
+
+    def publish(self, text):
+        with self.cond:
+            self.chunks.append(text)
+            self.cond.notify_all()
+
+    def finish(self, error=None):
+        with self.cond:
+            self.done = True
+            self.error = error
+            self.cond.notify_all()
+
+    def follow(self):
+        # Every caller replays the chunks from the start, so late joiners still see the whole response
+        index = 0
+        while True:
+            with self.cond:
+                while index >= len(self.chunks) and not self.done:
+                    self.cond.wait()
+                pending = self.chunks[index:]
+                index = len(self.chunks)
+                done, error = self.done, self.error
+
+            for text in pending:
+                yield text
+            if done:
+                if error is not None:
+                    raise error
+                return
+
+class AsyncFlight(Flight):
+    def __init__(self):
+        super().__init__()
+        self.cond = asyncio.Condition()
+        self.task = None
+
+    async def publish(self, text):
+        async with self.cond:
+            self.chunks.append(text)
+            self.cond.notify_all()
+
+    async def finish(self, error=None):
+        async with self.cond:
+            self.done = True
+            self.error = error
+            self.cond.notify_all()
+
+    async def follow(self):
+        index = 0
+        while True:
+            async with self.cond:
+                while index >= len(self.chunks) and not self.done:
+                    await self.cond.wait()
+                pending = self.chunks[index:]
+                index = len(self.chunks)
+                done, error = self.done, self.error
+
+            for text in pending:
+                yield text
+            if done:
+                if error is not None:
+                    raise error
+                return
+
+class SingleFlight:
+    # The generation runs on its own thread rather than in the first caller, so one
+    # caller giving up early doesn't cut the stream off for everyone who joined it
+    def __init__(self):
+        self.flights = {}
+        self.lock = threading.Lock()
+
+    def join(self, key, produce):
+        with self.lock:
+            flight = self.flights.get(key)
+            if flight is not None:
+                return flight, True
+            flight = self.flights[key] = Flight()
+
+        threading.Thread(target=self._run, args=(key, flight, produce), name="single-flight", daemon=True).start()
+        return flight, False
+
+    def _run(self, key, flight, produce):
+        error = None
+        try:
+            for text in produce():
+                flight.publish(text)
+        except Exception as e:
+            error = e
+        finally:
+            with self.lock:
+                del self.flights[key]
+            flight.finish(error)
+
+class AsyncSingleFlight(SingleFlight):
+    def join(self, key, produce):
+        flight = self.flights.get(key)
+        if flight is not None:
+            return flight, True
+
+        flight = self.flights[key] = AsyncFlight()
+        flight.task = asyncio.create_task(self._run(key, flight, produce))
+        return flight, False
+
+    async def _run(self, key, flight, produce):
+        error = None
+        try:
+            async for text in produce():
+                await flight.publish(text)
+        except asyncio.CancelledError:
+            error = Exception("Generation was cancelled")
+            raise
+        except Exception as e:
+            error = e
+        finally:
+            del self.flights[key]
+            await flight.finish(error)
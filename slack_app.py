@@ -0,0 +1,259 @@
+import importlib
+import os
+import threading
+import time
+from slack_bolt import App
+from translator import generate_stream, generate_many
+from gemini_client import warm_imports
+from streaming import coalesce
+from channel_cleaner import clear_channel
+from job_queue import job_queue, QueueFull
+from link_resolver import link_resolver
+from bot_metrics import request_name, track, stage, observe, record_error
+from quota import estimate_tokens
+from speculation import prefetched_stream
+from commands import (
+    COMMANDS, STREAM_RESPONSES, EXPIRED_BUTTON, INVALID_LINK, QUEUE_FULL, CLEARING,
+    parse_command, parse_input, charge_quota, refund_quota, queued_message, command_translation, Decoding, button_context,
+    used_message, full_input_reply, full_response_reply, regeneration, email_translation, translation_tokens,
+    clearing_progress, cleared_message, clear_failed_message
+)
+from slack_client import build_client
+from slack_sdk.errors import SlackApiError
+
+# Cold starts on free-tier hosts: skip the startup auth.test and import the Gemini SDK in the background
+FAST_START = os.environ.get("FAST_START", "false").lower() == "true"
+
+# Each transport module exposes serve(); they share this app and everything registered on it
+TRANSPORTS = {"http": "slack_bot", "socket": "slack_local_bot"}
+
+app = App(client=build_client(), token_verification_enabled=not FAST_START)
+
+@app.middleware
+def time_ack(body, next):
+    started = time.perf_counter()
+    try:
+        return next()
+    finally:
+        observe("ack", time.perf_counter() - started, request_name(body))
+
+@app.middleware
+def share_client(context, next):
+    # App hands each request a fresh plain client; the app's own one is pooled, paced and counted
+    context["client"] = app.client
+    # Injecting arguments into earlier middleware already built say() around the old client
+    context.pop("say", None)
+    return next()
+
+def process_input(client, user_input):
+    user_message, links = parse_input(user_input)
+    if links is None:
+        return user_message, False
+    if not links:
+        return None, True
+    with stage("link_fetch"):
+        return link_resolver.resolve(client, links), True
+
+def generate_with_loading_update(client, translation, use_cache=True, prefetched=None):
+    with stage("placeholder"):
+        translation.ts = client.chat_postMessage(**translation.loading())["ts"]
+    
+    chunks = generate_stream(translation.user_message, translation.mode, use_cache=use_cache)
+    if prefetched is not None:
+        chunks = prefetched_stream(prefetched, lambda: generate_stream(translation.user_message, translation.mode, use_cache=use_cache))
+    
+    started = time.perf_counter()
+    try:
+        if STREAM_RESPONSES:
+            response = ""
+            first_token_seconds = None
+            for response, done in coalesce(chunks):
+                if first_token_seconds is None:
+                    first_token_seconds = time.perf_counter() - started
+                    observe("first_token", first_token_seconds)
+                if done:
+                    break
+                update = translation.streaming(response)
+                if update is not None:
+                    with stage("chat_update"):
+                        client.chat_update(**update)
+        else:
+            response = "".join(chunks)
+            observe("first_token", time.perf_counter() - started)
+        observe("generation", time.perf_counter() - started)
+    except Exception as e:
+        record_error(e)
+        with stage("chat_update"):
+            client.chat_update(**translation.error(e))
+        return None
+    
+    with stage("chat_update"):
+        client.chat_update(**translation.final(response))
+    return response
+
+def submit_job(work, user_id, team_id, name, respond, channel_id=None, tokens=0):
+    refusal = charge_quota(user_id, channel_id, team_id, tokens, name)
+    if refusal is not None:
+        respond(refusal)
+        return
+    
+    try:
+        position = job_queue.submit(track(name, work), user_id, team_id, name)
+    except QueueFull as e:
+        record_error(e, name)
+        refund_quota(user_id, channel_id, team_id, tokens)
+        respond(QUEUE_FULL)
+        return
+    
+    if position > 0:
+        respond(queued_message(position))
+
+def translate_command(name):
+    def handle_command(ack, command, client, respond):
+        ack()
+        
+        user_input, modes = parse_command(name, command["text"])
+        if not user_input:
+            respond(COMMANDS[name]["usage"])
+            return
+        
+        def work():
+            user_message, is_link = process_input(client, user_input)
+            if user_message is None:
+                respond(INVALID_LINK)
+                return
+            generate_with_loading_update(client, command_translation(name, command, user_message, is_link))
+        
+        submit_job(work, command['user_id'], command.get('team_id'), name, respond, command['channel_id'], estimate_tokens(user_input, modes))
+    
+    return handle_command
+
+for name in ("/tellboss", "/tldr", "/befr"):
+    app.command(name)(translate_command(name))
+
+@app.command("/decode")
+def handle_decode_command(ack, command, client, respond):
+    ack()
+    
+    user_input, modes = parse_command("/decode", command["text"])
+    if not user_input:
+        respond(COMMANDS["/decode"]["usage"])
+        return
+    
+    def work():
+        user_message, is_link = process_input(client, user_input)
+        if user_message is None:
+            respond(INVALID_LINK)
+            return
+        
+        decoding = Decoding(command, user_message, is_link)
+        with stage("placeholder"):
+            decoding.ts = client.chat_postMessage(**decoding.loading())["ts"]
+        
+        try:
+            with stage("generation"):
+                responses = generate_many(user_message, modes)
+        except Exception as e:
+            record_error(e)
+            with stage("chat_update"):
+                client.chat_update(**decoding.error(e))
+            return
+        
+        with stage("chat_update"):
+            client.chat_update(**decoding.final(responses))
+    
+    submit_job(work, command['user_id'], command.get('team_id'), "/decode", respond, command['channel_id'], estimate_tokens(user_input, modes))
+
+@app.command("/clear")
+def handle_clear_command(ack, say, command, logger, client):
+    ack()
+    channel_id = command['channel_id']
+    user_id = command['user_id']
+
+    try:
+        status = say(CLEARING)
+
+        def report_progress(stats):
+            try:
+                client.chat_update(channel=channel_id, ts=status['ts'], text=clearing_progress(stats))
+            except SlackApiError as e:
+                logger.warning(f"Can't update /clear progress - {e.response['error']}")
+
+        stats = clear_channel(client, channel_id, skip_ts={status['ts']}, progress=report_progress)
+        logger.info(f"/clear in {channel_id}: {stats.summary()}")
+
+        client.chat_update(channel=channel_id, ts=status['ts'], text=cleared_message(stats))
+    
+    except SlackApiError as e:
+        logger.error(f"Error fetching messages: {e.response['error']}")
+        say(clear_failed_message(user_id, e))
+
+@app.action("use_message")
+def handle_use_message(ack, body, say, respond):
+    ack()
+    message = used_message(body)
+    if message is None:
+        respond(EXPIRED_BUTTON)
+        return
+    say(message)
+
+@app.action("show_full_input")
+def handle_show_full_input(ack, body, respond):
+    ack()
+    respond(**full_input_reply(body))
+
+@app.action("show_full_response")
+def handle_show_full_response(ack, body, respond):
+    ack()
+    respond(**full_response_reply(body))
+
+def regenerate_action(name, mode=None):
+    def handle_regenerate(ack, body, client, respond):
+        ack()
+        translation = regeneration(body, mode)
+        if translation is None:
+            respond(EXPIRED_BUTTON)
+            return
+        
+        def work():
+            generate_with_loading_update(client, translation, use_cache=False)
+        
+        user_id, channel_id, team_id = button_context(body)
+        submit_job(work, user_id, team_id, name, respond, channel_id, translation_tokens(translation))
+    
+    return handle_regenerate
+
+app.action("regenerate_message")(regenerate_action("regenerate_message"))
+app.action("regenerate_email")(regenerate_action("regenerate_email", "email"))
+
+@app.action("email_message")
+def handle_email_message(ack, body, client, respond):
+    ack()
+    translation, prefetched = email_translation(body)
+    if translation is None:
+        respond(EXPIRED_BUTTON)
+        return
+    
+    def work():
+        generate_with_loading_update(client, translation, prefetched=prefetched)
+    
+    user_id, channel_id, team_id = button_context(body)
+    submit_job(work, user_id, team_id, "email_message", respond, channel_id, translation_tokens(translation))
+
+@app.event("message")
+def handle_message_events(event, logger):
+    link_resolver.handle_event(event)
+
+def warm_up():
+    if FAST_START:
+        threading.Thread(target=warm_imports, name="warm-imports", daemon=True).start()
+    else:
+        warm_imports()
+
+def main(default_transport):
+    transport = os.environ.get("SLACK_TRANSPORT", default_transport)
+    if transport not in TRANSPORTS:
+        raise Exception(f"Unknown SLACK_TRANSPORT: {transport}")
+
+    warm_up()
+    importlib.import_module(TRANSPORTS[transport]).serve()
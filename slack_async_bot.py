@@ -0,0 +1,260 @@
+### == ASYNC RUNTIME (SOCKET OR HTTP) ===
+import asyncio
+import os
+import time
+from slack_bolt.async_app import AsyncApp
+from slack_bolt.adapter.socket_mode.async_handler import AsyncSocketModeHandler
+from translator import agenerate_stream, agenerate_many
+from gemini_client import warm_imports
+from streaming import acoalesce
+from channel_cleaner import clear_channel
+from job_queue import AsyncJobQueue, QueueFull, ASYNC_WORKER_POOL_SIZE
+from link_resolver import link_resolver
+import metrics
+from bot_metrics import request_name, atrack, stage, observe, record_error
+from quota import estimate_tokens
+from speculation import aprefetched_stream
+from commands import (
+    COMMANDS, STREAM_RESPONSES, EXPIRED_BUTTON, INVALID_LINK, QUEUE_FULL, CLEARING,
+    parse_command, parse_input, charge_quota, refund_quota, queued_message, command_translation, Decoding, button_context,
+    used_message, full_input_reply, full_response_reply, regeneration, email_translation, translation_tokens,
+    clearing_progress, cleared_message, clear_failed_message
+)
+from slack_client import build_client, build_async_client
+from slack_sdk.errors import SlackApiError
+
+METRICS_PORT = os.environ.get("METRICS_PORT")
+SLACK_TRANSPORT = os.environ.get("SLACK_TRANSPORT", "socket")
+
+app = AsyncApp(client=build_async_client())
+
+job_queue = AsyncJobQueue(workers=ASYNC_WORKER_POOL_SIZE)
+
+@app.middleware
+async def time_ack(body, next):
+    started = time.perf_counter()
+    try:
+        return await next()
+    finally:
+        observe("ack", time.perf_counter() - started, request_name(body))
+
+@app.middleware
+async def share_client(context, next):
+    # AsyncApp hands each request a fresh plain client; the app's own one is pooled, paced and counted
+    context["client"] = app.client
+    # Injecting arguments into earlier middleware already built say() around the old client
+    context.pop("say", None)
+    return await next()
+
+async def process_input(client, user_input):
+    user_message, links = parse_input(user_input)
+    if links is None:
+        return user_message, False
+    if not links:
+        return None, True
+    with stage("link_fetch"):
+        return await link_resolver.aresolve(client, links), True
+
+async def generate_with_loading_update(client, translation, use_cache=True, prefetched=None):
+    with stage("placeholder"):
+        translation.ts = (await client.chat_postMessage(**translation.loading()))["ts"]
+    
+    chunks = agenerate_stream(translation.user_message, translation.mode, use_cache=use_cache)
+    if prefetched is not None:
+        chunks = aprefetched_stream(prefetched, lambda: agenerate_stream(translation.user_message, translation.mode, use_cache=use_cache))
+    
+    started = time.perf_counter()
+    try:
+        if STREAM_RESPONSES:
+            response = ""
+            first_token_seconds = None
+            async for response, done in acoalesce(chunks):
+                if first_token_seconds is None:
+                    first_token_seconds = time.perf_counter() - started
+                    observe("first_token", first_token_seconds)
+                if done:
+                    break
+                update = translation.streaming(response)
+                if update is not None:
+                    with stage("chat_update"):
+                        await client.chat_update(**update)
+        else:
+            response = "".join([text async for text in chunks])
+            observe("first_token", time.perf_counter() - started)
+        observe("generation", time.perf_counter() - started)
+    except Exception as e:
+        record_error(e)
+        with stage("chat_update"):
+            await client.chat_update(**translation.error(e))
+        return None
+    
+    with stage("chat_update"):
+        await client.chat_update(**translation.final(response))
+    return response
+
+async def submit_job(work, user_id, team_id, name, respond, channel_id=None, tokens=0):
+    refusal = charge_quota(user_id, channel_id, team_id, tokens, name)
+    if refusal is not None:
+        await respond(refusal)
+        return
+    
+    try:
+        position = await job_queue.submit(atrack(name, work), user_id, team_id, name)
+    except QueueFull as e:
+        record_error(e, name)
+        refund_quota(user_id, channel_id, team_id, tokens)
+        await respond(QUEUE_FULL)
+        return
+    
+    if position > 0:
+        await respond(queued_message(position))
+
+def translate_command(name):
+    async def handle_command(ack, command, client, respond):
+        await ack()
+        
+        user_input, modes = parse_command(name, command["text"])
+        if not user_input:
+            await respond(COMMANDS[name]["usage"])
+            return
+        
+        async def work():
+            user_message, is_link = await process_input(client, user_input)
+            if user_message is None:
+                await respond(INVALID_LINK)
+                return
+            await generate_with_loading_update(client, command_translation(name, command, user_message, is_link))
+        
+        await submit_job(work, command['user_id'], command.get('team_id'), name, respond, command['channel_id'], estimate_tokens(user_input, modes))
+    
+    return handle_command
+
+for name in ("/tellboss", "/tldr", "/befr"):
+    app.command(name)(translate_command(name))
+
+@app.command("/decode")
+async def handle_decode_command(ack, command, client, respond):
+    await ack()
+    
+    user_input, modes = parse_command("/decode", command["text"])
+    if not user_input:
+        await respond(COMMANDS["/decode"]["usage"])
+        return
+    
+    async def work():
+        user_message, is_link = await process_input(client, user_input)
+        if user_message is None:
+            await respond(INVALID_LINK)
+            return
+        
+        decoding = Decoding(command, user_message, is_link)
+        with stage("placeholder"):
+            decoding.ts = (await client.chat_postMessage(**decoding.loading()))["ts"]
+        
+        try:
+            with stage("generation"):
+                responses = await agenerate_many(user_message, modes)
+        except Exception as e:
+            record_error(e)
+            with stage("chat_update"):
+                await client.chat_update(**decoding.error(e))
+            return
+        
+        with stage("chat_update"):
+            await client.chat_update(**decoding.final(responses))
+    
+    await submit_job(work, command['user_id'], command.get('team_id'), "/decode", respond, command['channel_id'], estimate_tokens(user_input, modes))
+
+@app.command("/clear")
+async def handle_clear_command(ack, say, command, logger, client):
+    await ack()
+    channel_id = command['channel_id']
+    user_id = command['user_id']
+
+    try:
+        status = await say(CLEARING)
+        sync_client = build_client(client.token)
+
+        def report_progress(stats):
+            try:
+                sync_client.chat_update(channel=channel_id, ts=status['ts'], text=clearing_progress(stats))
+            except SlackApiError as e:
+                logger.warning(f"Can't update /clear progress - {e.response['error']}")
+
+        stats = await asyncio.to_thread(clear_channel, sync_client, channel_id, skip_ts={status['ts']}, progress=report_progress)
+        logger.info(f"/clear in {channel_id}: {stats.summary()}")
+
+        await client.chat_update(channel=channel_id, ts=status['ts'], text=cleared_message(stats))
+    
+    except SlackApiError as e:
+        logger.error(f"Error fetching messages: {e.response['error']}")
+        await say(clear_failed_message(user_id, e))
+
+@app.action("use_message")
+async def handle_use_message(ack, body, say, respond):
+    await ack()
+    message = used_message(body)
+    if message is None:
+        await respond(EXPIRED_BUTTON)
+        return
+    await say(message)
+
+@app.action("show_full_input")
+async def handle_show_full_input(ack, body, respond):
+    await ack()
+    await respond(**full_input_reply(body))
+
+@app.action("show_full_response")
+async def handle_show_full_response(ack, body, respond):
+    await ack()
+    await respond(**full_response_reply(body))
+
+def regenerate_action(name, mode=None):
+    async def handle_regenerate(ack, body, client, respond):
+        await ack()
+        translation = regeneration(body, mode)
+        if translation is None:
+            await respond(EXPIRED_BUTTON)
+            return
+        
+        async def work():
+            await generate_with_loading_update(client, translation, use_cache=False)
+        
+        user_id, channel_id, team_id = button_context(body)
+        await submit_job(work, user_id, team_id, name, respond, channel_id, translation_tokens(translation))
+    
+    return handle_regenerate
+
+app.action("regenerate_message")(regenerate_action("regenerate_message"))
+app.action("regenerate_email")(regenerate_action("regenerate_email", "email"))
+
+@app.action("email_message")
+async def handle_email_message(ack, body, client, respond):
+    await ack()
+    translation, prefetched = email_translation(body)
+    if translation is None:
+        await respond(EXPIRED_BUTTON)
+        return
+    
+    async def work():
+        await generate_with_loading_update(client, translation, prefetched=prefetched)
+    
+    user_id, channel_id, team_id = button_context(body)
+    await submit_job(work, user_id, team_id, "email_message", respond, channel_id, translation_tokens(translation))
+
+@app.event("message")
+async def handle_message_events(event, logger):
+    link_resolver.handle_event(event)
+
+async def start_socket_mode():
+    handler = AsyncSocketModeHandler(app, os.environ["SLACK_BOT_SOCKET_TOKEN"])
+    await handler.start_async()
+
+if __name__ == "__main__":
+    warm_imports()
+    if METRICS_PORT:
+        metrics.start_http_server(int(METRICS_PORT))
+    if SLACK_TRANSPORT == "http":
+        app.start(port=int(os.environ.get("PORT", 3000)), host="0.0.0.0")
+    else:
+        asyncio.run(start_socket_mode())
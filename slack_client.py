@@ -0,0 +1,215 @@
+import asyncio
+import io
+import math
+import os
+import threading
+import time
+from http.client import HTTPMessage
+from urllib.error import HTTPError, URLError
+import aiohttp
+import urllib3
+from cachetools import TTLCache
+from slack_sdk import WebClient
+from slack_sdk.web.async_client import AsyncWebClient
+from slack_sdk.http_retry.builtin_handlers import ConnectionErrorRetryHandler, RateLimitErrorRetryHandler
+from slack_sdk.http_retry.builtin_async_handlers import AsyncConnectionErrorRetryHandler, AsyncRateLimitErrorRetryHandler
+from rate_limit import TokenBucket
+from bot_metrics import count_slack_call
+import metrics
+
+SLACK_API_URL = os.environ.get("SLACK_API_URL")
+SLACK_POOL_SIZE = int(os.environ.get("SLACK_POOL_SIZE", 16))
+SLACK_RATE_LIMIT_RETRIES = int(os.environ.get("SLACK_RATE_LIMIT_RETRIES", 2))
+SLACK_CONNECTION_RETRIES = int(os.environ.get("SLACK_CONNECTION_RETRIES", 2))
+# Multiplies Slack's published per-minute limits, 0 turns pacing off
+SLACK_RATE_LIMIT_SCALE = float(os.environ.get("SLACK_RATE_LIMIT_SCALE", 1))
+# Streamed updates are skipped once chat.update has fewer calls than this left, so final answers never wait
+SLACK_UPDATE_RESERVE = float(os.environ.get("SLACK_UPDATE_RESERVE", 5))
+
+# Calls per minute per workspace for each tier, see https://api.slack.com/apis/rate-limits
+TIER_LIMITS = {1: 1, 2: 20, 3: 50, 4: 100}
+METHOD_TIERS = {
+    "auth.test": 4,
+    "chat.update": 3,
+    "chat.delete": 3,
+    "chat.postEphemeral": 4,
+    "conversations.history": 3,
+    "conversations.replies": 3
+}
+DEFAULT_TIER = 3
+# chat.postMessage isn't tiered: it allows about one message per second in each channel
+PER_CHANNEL_LIMITS = {"chat.postMessage": 60}
+
+slack_retries = metrics.counter("translator_slack_retries_total", "Slack Web API calls retried, by method and reason (rate_limited, connection)")
+slack_paced = metrics.counter("translator_slack_paced_seconds_total", "Seconds spent waiting for Slack rate limit budget, by method")
+slack_budget = metrics.gauge("translator_slack_rate_budget", "Slack Web API calls left in the current per-minute budget, by method")
+
+class SlackRateLimiter:
+    def __init__(self, scale=SLACK_RATE_LIMIT_SCALE, max_channels=10000):
+        self.scale = scale
+        self.buckets = {}
+        # A channel bucket that sat idle for a minute is full again, so forgetting it loses nothing
+        self.channel_buckets = TTLCache(maxsize=max_channels, ttl=60)
+        self.lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return self.scale > 0
+
+    def bucket(self, method, channel=None):
+        with self.lock:
+            if method in PER_CHANNEL_LIMITS:
+                bucket = self.channel_buckets.get((method, channel))
+                if bucket is None:
+                    bucket = self.new_bucket(PER_CHANNEL_LIMITS[method])
+                self.channel_buckets[(method, channel)] = bucket
+                return bucket
+
+            bucket = self.buckets.get(method)
+            if bucket is None:
+                bucket = self.buckets[method] = self.new_bucket(TIER_LIMITS[METHOD_TIERS.get(method, DEFAULT_TIER)])
+            return bucket
+
+    def new_bucket(self, per_minute):
+        # Slack counts calls per minute and tolerates bursts, so a whole minute's budget can go at once
+        per_minute = per_minute * self.scale
+        return TokenBucket(per_minute / 60, capacity=per_minute)
+
+    def acquire(self, method, channel=None):
+        if not self.enabled:
+            return
+        bucket = self.bucket(method, channel)
+        started = time.monotonic()
+        bucket.acquire()
+        self.report(method, bucket, time.monotonic() - started)
+
+    async def aacquire(self, method, channel=None):
+        if not self.enabled:
+            return
+        bucket = self.bucket(method, channel)
+        started = time.monotonic()
+        while not bucket.try_acquire():
+            await asyncio.sleep(max(bucket.wait_time(), 0.001))
+        self.report(method, bucket, time.monotonic() - started)
+
+    def report(self, method, bucket, waited):
+        if waited > 0.001:
+            slack_paced.inc(waited, method=method)
+        slack_budget.set(bucket.available(), method=method)
+
+    def remaining(self, method, channel=None):
+        if not self.enabled:
+            return math.inf
+        return self.bucket(method, channel).available()
+
+    def pause(self, method, seconds):
+        # A 429 means Slack's count is ahead of ours, so stop everyone calling the method until it says so
+        if self.enabled and method not in PER_CHANNEL_LIMITS:
+            self.bucket(method).pause(seconds)
+
+slack_limiter = SlackRateLimiter()
+
+def call_channel(kwargs):
+    payload = kwargs.get("json") or kwargs.get("params") or kwargs.get("data") or {}
+    return payload.get("channel")
+
+def request_method(request):
+    return request.url.rstrip("/").rsplit("/", 1)[-1]
+
+def retry_after(response):
+    for key, values in response.headers.items():
+        if key.lower() == "retry-after":
+            try:
+                return float(values[0] if isinstance(values, list) else values)
+            except (TypeError, ValueError):
+                break
+    return 1.0
+
+class RateLimitRetryHandler(RateLimitErrorRetryHandler):
+    def prepare_for_next_attempt(self, *, state, request, response=None, error=None):
+        if response is not None:
+            slack_retries.inc(method=request_method(request), reason="rate_limited")
+            slack_limiter.pause(request_method(request), retry_after(response))
+        super().prepare_for_next_attempt(state=state, request=request, response=response, error=error)
+
+class ConnectionRetryHandler(ConnectionErrorRetryHandler):
+    def prepare_for_next_attempt(self, *, state, request, response=None, error=None):
+        slack_retries.inc(method=request_method(request), reason="connection")
+        super().prepare_for_next_attempt(state=state, request=request, response=response, error=error)
+
+class AsyncRateLimitRetryHandler(AsyncRateLimitErrorRetryHandler):
+    async def prepare_for_next_attempt_async(self, *, state, request, response=None, error=None):
+        if response is not None:
+            slack_retries.inc(method=request_method(request), reason="rate_limited")
+            slack_limiter.pause(request_method(request), retry_after(response))
+        await super().prepare_for_next_attempt_async(state=state, request=request, response=response, error=error)
+
+class AsyncConnectionRetryHandler(AsyncConnectionErrorRetryHandler):
+    async def prepare_for_next_attempt_async(self, *, state, request, response=None, error=None):
+        slack_retries.inc(method=request_method(request), reason="connection")
+        await super().prepare_for_next_attempt_async(state=state, request=request, response=response, error=error)
+
+def build_pool():
+    return urllib3.PoolManager(maxsize=SLACK_POOL_SIZE, retries=False)
+
+pool = build_pool()
+
+def reset_pool():
+    # Sockets opened before a fork must not be shared between processes
+    global pool
+    pool = build_pool()
+
+class SlackClient(WebClient):
+    def api_call(self, api_method, **kwargs):
+        count_slack_call(api_method)
+        slack_limiter.acquire(api_method, call_channel(kwargs))
+        return super().api_call(api_method, **kwargs)
+
+    def _perform_urllib_http_request_internal(self, url, req):
+        # Same contract as the urllib version it replaces, but connections are kept alive and reused
+        if self.proxy is not None or self.ssl is not None or not url.lower().startswith("http"):
+            return super()._perform_urllib_http_request_internal(url, req)
+
+        try:
+            resp = pool.request(req.get_method(), url, body=req.data, headers=dict(req.header_items()), timeout=self.timeout)
+        except urllib3.exceptions.NewConnectionError as e:
+            raise URLError(e) from e
+        except urllib3.exceptions.TimeoutError as e:
+            raise TimeoutError(str(e)) from e
+        except urllib3.exceptions.HTTPError as e:
+            raise URLError(e) from e
+
+        headers = HTTPMessage()
+        for key, value in resp.headers.items():
+            headers[key] = value
+        if resp.status >= 400:
+            raise HTTPError(url, resp.status, resp.reason, headers, io.BytesIO(resp.data))
+
+        if headers.get_content_type() == "application/gzip":
+            return {"status": resp.status, "headers": headers, "body": resp.data}
+        return {"status": resp.status, "headers": headers, "body": resp.data.decode(headers.get_content_charset() or "utf-8")}
+
+class AsyncSlackClient(AsyncWebClient):
+    async def api_call(self, api_method, **kwargs):
+        count_slack_call(api_method)
+        await slack_limiter.aacquire(api_method, call_channel(kwargs))
+        if self.session is None or self.session.closed:
+            # Without a session of its own the SDK opens a new one, and a new connection, for every call
+            self.session = aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=SLACK_POOL_SIZE), timeout=aiohttp.ClientTimeout(total=self.timeout))
+        return await super().api_call(api_method, **kwargs)
+
+    async def close(self):
+        if self.session is not None and not self.session.closed:
+            await self.session.close()
+
+def retry_handlers():
+    return [RateLimitRetryHandler(max_retry_count=SLACK_RATE_LIMIT_RETRIES), ConnectionRetryHandler(max_retry_count=SLACK_CONNECTION_RETRIES)]
+
+def async_retry_handlers():
+    return [AsyncRateLimitRetryHandler(max_retry_count=SLACK_RATE_LIMIT_RETRIES), AsyncConnectionRetryHandler(max_retry_count=SLACK_CONNECTION_RETRIES)]
+
+def build_client(token=None):
+    return SlackClient(token=token or os.environ["SLACK_BOT_TOKEN"], base_url=SLACK_API_URL or WebClient.BASE_URL, retry_handlers=retry_handlers())
+
+def build_async_client(token=None):
+    return AsyncSlackClient(token=token or os.environ["SLACK_BOT_TOKEN"], base_url=SLACK_API_URL or AsyncWebClient.BASE_URL, retry_handlers=async_retry_handlers())
@@ -0,0 +1,34 @@
+import re
+from urllib.parse import urlparse, parse_qs
+from resilience import UpstreamUnavailable, UpstreamTimeout, is_retryable
+
+MODE_LABELS = {
+    "corporate": "🏢 Corporate version",
+    "casual": "🗣️ Plain English",
+    "real": "🙄 What they actually mean"
+}
+
+def format_quoted_message(message):
+    lines = message.split('\n')
+    formatted_lines = [f"> {line}" for line in lines]
+    return '\n'.join(formatted_lines)
+
+def extract_message_links(text):
+    pattern = r'https://[^/\s]+\.slack\.com/archives/([^/\s]+)/p(\d+)(\?[^\s>|]*)?'
+    links = []
+    
+    for match in re.finditer(pattern, text):
+        channel_id = match.group(1)
+        timestamp = match.group(2)
+        timestamp = timestamp[:10] + '.' + timestamp[10:]
+        query = parse_qs(urlparse(match.group(0)).query)
+        thread_ts = query.get("thread_ts", [None])[0]
+        links.append((channel_id, timestamp, thread_ts))
+    return links
+
+def describe_failure(error):
+    if isinstance(error, UpstreamUnavailable) or is_retryable(error):
+        return "😴 The AI is down for a nap right now - give it a minute and hit Try Again."
+    if isinstance(error, UpstreamTimeout):
+        return "⌛ The AI took too long to answer (probably busy with someone else's boss) - hit Try Again."
+    return "⚠️ The AI tripped over this one - hit Try Again or rephrase your message."
@@ -0,0 +1,85 @@
+import asyncio
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from translator import generate
+from quota import estimate_tokens
+import metrics
+
+SPECULATE_EMAIL = os.environ.get("SPECULATE_EMAIL", "false").lower() == "true"
+SPECULATION_TTL = float(os.environ.get("SPECULATION_TTL", 120))
+SPECULATION_SIZE = int(os.environ.get("SPECULATION_SIZE", 500))
+SPECULATION_WORKERS = int(os.environ.get("SPECULATION_WORKERS", 4))
+
+speculations = metrics.counter("translator_speculations_total", "Speculative email generations by outcome (started, hit, miss, cancelled, wasted)")
+wasted_tokens = metrics.counter("translator_speculation_wasted_tokens_total", "Estimated Gemini tokens spent on speculative generations nobody claimed")
+
+class Speculator:
+    def __init__(self, ttl=SPECULATION_TTL, max_entries=SPECULATION_SIZE, workers=SPECULATION_WORKERS):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="speculation")
+
+    def start(self, key, fn, tokens):
+        now = time.monotonic()
+        with self.lock:
+            self._evict(now)
+            if key in self.entries:
+                return False
+            self.entries[key] = (self.executor.submit(fn), tokens, now + self.ttl)
+            while len(self.entries) > self.max_entries:
+                key, (future, tokens, expires) = self.entries.popitem(last=False)
+                self._discard(future, tokens)
+        speculations.inc(outcome="started")
+        return True
+
+    def claim(self, key):
+        with self.lock:
+            self._evict(time.monotonic())
+            entry = self.entries.pop(key, None)
+        speculations.inc(outcome="hit" if entry else "miss")
+        return entry[0] if entry else None
+
+    def _evict(self, now):
+        while self.entries:
+            key, (future, tokens, expires) = next(iter(self.entries.items()))
+            if expires > now:
+                return
+            del self.entries[key]
+            self._discard(future, tokens)
+
+    def _discard(self, future, tokens):
+        # Still queued behind other speculations: nothing was spent yet
+        if future.cancel():
+            speculations.inc(outcome="cancelled")
+            return
+        speculations.inc(outcome="wasted")
+        wasted_tokens.inc(tokens)
+
+speculator = Speculator()
+
+def speculate_email(key, response):
+    return speculator.start(key, lambda: generate(response, "email"), estimate_tokens(response, ["email"]))
+
+def prefetched_stream(future, fallback):
+    try:
+        text = future.result()
+    except Exception as e:
+        print(f"Error in speculative generation: {str(e)}")
+        yield from fallback()
+        return
+    yield text
+
+async def aprefetched_stream(future, fallback):
+    try:
+        text = await asyncio.wrap_future(future)
+    except Exception as e:
+        print(f"Error in speculative generation: {str(e)}")
+        async for text in fallback():
+            yield text
+        return
+    yield text
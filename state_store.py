@@ -0,0 +1,169 @@
+import json
+import os
+import re
+import secrets
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+STATE_STORE = os.environ.get("STATE_STORE", "memory")
+STATE_STORE_PATH = os.environ.get("STATE_STORE_PATH", "state.db")
+STATE_STORE_URL = os.environ.get("STATE_STORE_URL", "redis://localhost:6379/0")
+STATE_STORE_SIZE = int(os.environ.get("STATE_STORE_SIZE", 10000))
+STATE_TTL = float(os.environ.get("STATE_TTL", 7 * 24 * 3600))
+
+JOB_ID_PATTERN = re.compile(r"^j_[A-Za-z0-9_-]{12}(:\d+)?$")
+
+class MemoryBackend:
+    def __init__(self, max_entries=STATE_STORE_SIZE, ttl=STATE_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def reconnect(self):
+        pass
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            value, expires = entry
+            if time.time() >= expires:
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self.lock:
+            self.entries[key] = (value, time.time() + self.ttl)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+class SqliteBackend:
+    def __init__(self, path=STATE_STORE_PATH, ttl=STATE_TTL):
+        self.path = path
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.writes = 0
+        self.reconnect()
+
+    def reconnect(self):
+        self.db = sqlite3.connect(self.path, check_same_thread=False)
+        self.db.execute("CREATE TABLE IF NOT EXISTS jobs (key TEXT PRIMARY KEY, value TEXT, expires REAL)")
+        self.db.commit()
+
+    def get(self, key):
+        with self.lock:
+            row = self.db.execute("SELECT value FROM jobs WHERE key = ? AND expires > ?", (key, time.time())).fetchone()
+        return row[0] if row else None
+
+    def set(self, key, value):
+        now = time.time()
+        with self.lock:
+            self.db.execute("INSERT OR REPLACE INTO jobs (key, value, expires) VALUES (?, ?, ?)", (key, value, now + self.ttl))
+            self.writes += 1
+            if self.writes % 500 == 0:
+                self.db.execute("DELETE FROM jobs WHERE expires <= ?", (now,))
+            self.db.commit()
+
+class RedisBackend:
+    def __init__(self, url=STATE_STORE_URL, ttl=STATE_TTL):
+        try:
+            import redis
+        except ImportError:
+            raise Exception("STATE_STORE=redis needs the redis package (pip install redis)")
+        self.ttl = ttl
+        self.client = redis.Redis.from_url(url, decode_responses=True)
+
+    def reconnect(self):
+        self.client.connection_pool.reset()
+
+    def get(self, key):
+        return self.client.get(f"translator:job:{key}")
+
+    def set(self, key, value):
+        self.client.set(f"translator:job:{key}", value, ex=int(self.ttl))
+
+def build_backend(kind=STATE_STORE):
+    if kind == "memory":
+        return MemoryBackend()
+    if kind == "sqlite":
+        return SqliteBackend()
+    if kind == "redis":
+        return RedisBackend()
+    raise Exception(f"Unknown STATE_STORE: {kind}")
+
+class StateStore:
+    def __init__(self, backend):
+        self.backend = backend
+        self.lock = threading.Lock()
+
+    def create_job(self, user_input, mode, is_link=False, user_id=None, channel_id=None, history=()):
+        job_id = "j_" + secrets.token_urlsafe(9)
+        self.save(job_id, {
+            "input": user_input,
+            "mode": mode,
+            "is_link": is_link,
+            "user_id": user_id,
+            "channel_id": channel_id,
+            "history": list(history),
+            "created": time.time()
+        })
+        return job_id
+
+    def save(self, job_id, job):
+        self.backend.set(job_id, json.dumps(job, ensure_ascii=False))
+
+    def get_job(self, job_id):
+        value = self.backend.get(job_id)
+        if value is None:
+            return None
+        job = json.loads(value)
+        job["id"] = job_id
+        return job
+
+    def add_response(self, job_id, response):
+        with self.lock:
+            job = self.get_job(job_id)
+            if job is None:
+                return None
+            job["history"].append(response)
+            del job["id"]
+            self.save(job_id, job)
+            return len(job["history"]) - 1
+
+    def button_job(self, value):
+        return self.get_job(value.split(":")[0])
+
+    def button_response(self, value):
+        job_id, _, index = value.partition(":")
+        job = self.get_job(job_id)
+        if job is None or not job["history"]:
+            return None
+        index = int(index) if index else len(job["history"]) - 1
+        return job["history"][min(index, len(job["history"]) - 1)]
+
+def is_job_value(value):
+    return bool(JOB_ID_PATTERN.match(value or ""))
+
+state_store = StateStore(build_backend())
+
+def load_button_job(value, mode=None):
+    if is_job_value(value):
+        return state_store.button_job(value)
+
+    # Buttons posted before job IDs carried the text itself ("message|mode")
+    if mode is None:
+        parts = value.rsplit("|", 1)
+        value, mode = parts[0], (parts[1] if len(parts) > 1 else "corporate")
+    return {"id": None, "input": value, "mode": mode, "is_link": False, "history": []}
+
+def load_button_response(value):
+    if is_job_value(value):
+        return state_store.button_response(value)
+    return value
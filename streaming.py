@@ -0,0 +1,52 @@
+import os
+import time
+
+STREAM_UPDATE_INTERVAL = float(os.environ.get("STREAM_UPDATE_INTERVAL", 1.0))
+STREAM_UPDATE_CHARS = int(os.environ.get("STREAM_UPDATE_CHARS", 200))
+STREAM_MIN_INTERVAL = float(os.environ.get("STREAM_MIN_INTERVAL", 0.5))
+
+def coalesce(chunks, interval=STREAM_UPDATE_INTERVAL, max_chars=STREAM_UPDATE_CHARS, min_interval=STREAM_MIN_INTERVAL):
+    text = ""
+    last_update = None
+    last_length = 0
+
+    for chunk in chunks:
+        text += chunk
+        now = time.monotonic()
+
+        if last_update is None:
+            due = True
+        else:
+            elapsed = now - last_update
+            pending = len(text) - last_length
+            due = elapsed >= interval or (pending >= max_chars and elapsed >= min_interval)
+
+        if due:
+            last_update = now
+            last_length = len(text)
+            yield text, False
+
+    yield text, True
+
+async def acoalesce(chunks, interval=STREAM_UPDATE_INTERVAL, max_chars=STREAM_UPDATE_CHARS, min_interval=STREAM_MIN_INTERVAL):
+    text = ""
+    last_update = None
+    last_length = 0
+
+    async for chunk in chunks:
+        text += chunk
+        now = time.monotonic()
+
+        if last_update is None:
+            due = True
+        else:
+            elapsed = now - last_update
+            pending = len(text) - last_length
+            due = elapsed >= interval or (pending >= max_chars and elapsed >= min_interval)
+
+        if due:
+            last_update = now
+            last_length = len(text)
+            yield text, False
+
+    yield text, True
@@ -0,0 +1,7 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Tests must not leave usage databases behind
+os.environ.setdefault("QUOTA_USAGE_DB", "")
@@ -0,0 +1,44 @@
+import json
+import sys
+import batch
+
+def fake_generate(text, mode, use_cache=True):
+    return text.upper()
+
+def test_results_keep_input_order(monkeypatch):
+    monkeypatch.setattr(batch, "generate", fake_generate)
+    rows = [{"id": i, "text": f"row {i}"} for i in range(30)]
+    results = list(batch.translate_batch(rows, parallelism=4, rate=1000))
+    assert [result["id"] for result in results] == list(range(30))
+    assert results[3]["output"] == "ROW 3"
+
+def test_zero_rate_means_no_limit(monkeypatch):
+    monkeypatch.setattr(batch, "generate", fake_generate)
+    rows = [{"id": i, "text": "hi"} for i in range(20)]
+    for rate in (0, -1):
+        results = list(batch.translate_batch(rows, parallelism=2, rate=rate))
+        assert len(results) == 20
+        assert all("error" not in result for result in results)
+
+def run_main(monkeypatch, tmp_path, rows):
+    source = tmp_path / "input.jsonl"
+    source.write_text("".join(json.dumps(row) + "\n" for row in rows))
+    argv = ["batch.py", str(source), "-o", str(tmp_path / "output.jsonl"), "--checkpoint", str(tmp_path / "checkpoint.json"), "--rate", "0"]
+    monkeypatch.setattr(sys, "argv", argv)
+    batch.main()
+
+def test_resume_drops_rows_written_after_the_checkpoint(monkeypatch, tmp_path):
+    monkeypatch.setattr(batch, "generate", fake_generate)
+    rows = [{"id": i, "text": f"row {i}"} for i in range(10)]
+    run_main(monkeypatch, tmp_path, rows[:4])
+
+    # A killed run can leave rows the checkpoint never recorded, the last one cut off mid-line
+    output = tmp_path / "output.jsonl"
+    with open(output, "a") as f:
+        f.write(json.dumps({"id": 4, "output": "ROW 4"}) + "\n")
+        f.write('{"id": 5, "out')
+
+    run_main(monkeypatch, tmp_path, rows)
+    results = [json.loads(line) for line in output.read_text().splitlines()]
+    assert [result["id"] for result in results] == list(range(10))
+    assert json.loads((tmp_path / "checkpoint.json").read_text())["completed"] == 10
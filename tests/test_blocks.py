@@ -0,0 +1,63 @@
+import random
+from blocks import (MessageView, quoted_pieces, full_text_blocks, SECTION_TEXT_LIMIT, HEADER_TEXT_LIMIT, MESSAGE_BLOCK_LIMIT,
+                    INPUT_SECTIONS, RESPONSE_SECTIONS)
+
+def long_inputs():
+    rng = random.Random(7)
+    words = ["synergy", "alignment", "bandwidth", "paradigm", "leverage", "circle", "back"]
+    yield "word " * 5000
+    yield "x" * 20000
+    yield "\n".join("line " * rng.randint(0, 200) for _ in range(400))
+    yield "\n" * 5000
+    yield "\n".join(" ".join(rng.choice(words) for _ in range(rng.randint(1, 900))) for _ in range(60))
+    yield ("> quoted\n" * 800) + "y" * 4000
+
+def assert_valid(blocks):
+    assert len(blocks) <= MESSAGE_BLOCK_LIMIT
+    for block in blocks:
+        if block["type"] == "section":
+            assert len(block["text"]["text"]) <= SECTION_TEXT_LIMIT
+        if block["type"] == "header":
+            assert len(block["text"]["text"]) <= HEADER_TEXT_LIMIT
+
+def action_ids(blocks):
+    return [element["action_id"] for block in blocks if block["type"] == "actions" for element in block["elements"]]
+
+def test_quoted_pieces_fit_a_section():
+    for text in long_inputs():
+        for limit in (100, 500, SECTION_TEXT_LIMIT):
+            pieces, truncated = quoted_pieces("*Boss's Message:*", text, 10, limit)
+            assert 1 <= len(pieces) <= 10
+            assert all(len(piece) <= limit for piece in pieces)
+            assert truncated or "".join(pieces).count("synergy") == text.count("synergy")
+
+def test_short_text_is_one_untruncated_piece():
+    assert quoted_pieces("*Title:*", "one\ntwo", 2) == (["*Title:*\n\n> one\n> two"], False)
+
+def test_every_payload_stays_within_slack_limits():
+    for text in long_inputs():
+        view = MessageView("📢 " + "Header " * 40, text, "Boss's Message", "U1")
+        assert_valid(view.loading("job"))
+        assert_valid(view.streaming(text, "job"))
+        assert_valid(view.error(Exception("boom"), "corporate", "job"))
+
+        final = view.final(text, "corporate", "job")
+        assert_valid(final)
+        assert "show_full_input" in action_ids(final)
+        assert "show_full_response" in action_ids(final)
+        assert sum(block["type"] == "section" for block in final) == INPUT_SECTIONS + RESPONSE_SECTIONS
+
+def test_decode_all_stays_within_the_block_limit():
+    for text in long_inputs():
+        view = MessageView("📢 Your boss, fully decoded 🔍", text, "Boss's Message", "U1")
+        responses = {"corporate": text, "casual": text, "real": None}
+        blocks = view.multi_final(responses, {mode: f"job-{mode}" for mode in responses})
+        assert_valid(blocks)
+        assert action_ids(blocks).count("show_full_response") == 2
+
+def test_full_text_fills_one_message_at_most():
+    for text in long_inputs():
+        assert_valid(full_text_blocks("Original Message", text))
+    blocks = full_text_blocks("Original Message", "word " * 100000)
+    assert len(blocks) == MESSAGE_BLOCK_LIMIT
+    assert blocks[-1]["text"]["text"].startswith("✂️")
@@ -0,0 +1,38 @@
+from slack_sdk.errors import SlackApiError
+from slack_sdk.web import SlackResponse
+from channel_cleaner import clear_channel
+
+def api_error(error):
+    response = SlackResponse(client=None, http_verb="POST", api_url="chat.delete", req_args={}, data={"ok": False, "error": error}, headers={}, status_code=200)
+    return SlackApiError(error, response)
+
+class FakeClient:
+    def __init__(self, pages, errors=None):
+        self.pages = pages
+        self.errors = errors or {}
+        self.deleted = []
+        self.history_calls = 0
+
+    def conversations_history(self, channel, limit, cursor=None):
+        page = self.pages[int(cursor or 0)]
+        self.history_calls += 1
+        next_cursor = str(int(cursor or 0) + 1)
+        has_more = int(next_cursor) < len(self.pages)
+        return {"messages": [{"ts": ts} for ts in page], "has_more": has_more, "response_metadata": {"next_cursor": next_cursor if has_more else ""}}
+
+    def chat_delete(self, channel, ts):
+        if ts in self.errors:
+            raise api_error(self.errors[ts])
+        self.deleted.append(ts)
+
+def test_deletes_every_page_except_skipped_messages():
+    client = FakeClient([["1", "2", "3"], ["4", "5"]])
+    stats = clear_channel(client, "C1", skip_ts={"2"}, concurrency=2)
+    assert sorted(client.deleted) == ["1", "3", "4", "5"]
+    assert client.history_calls == 2
+    assert (stats.deleted, stats.skipped, stats.failed, stats.pages) == (4, 0, 0, 2)
+
+def test_undeletable_messages_are_skipped_and_other_errors_fail():
+    client = FakeClient([["1", "2", "3"]], errors={"2": "cant_delete_message", "3": "ratelimited"})
+    stats = clear_channel(client, "C1")
+    assert (stats.deleted, stats.skipped, stats.failed) == (1, 1, 1)
@@ -0,0 +1,42 @@
+import random
+from chunking import split_text
+
+WORDS = ["we", "are", "aligning", "synergies", "across", "verticals", "to", "unlock", "value", "going", "forward"]
+
+def memo(seed, paragraphs=6):
+    rng = random.Random(seed)
+    text = []
+    for _ in range(paragraphs):
+        sentences = []
+        for _ in range(rng.randint(1, 8)):
+            sentence = " ".join(rng.choice(WORDS) for _ in range(rng.randint(3, 40)))
+            sentences.append(sentence.capitalize() + rng.choice([".", "!", "?"]))
+        text.append(" ".join(sentences))
+    return "\n\n".join(text)
+
+def test_chunks_stay_within_the_limit_and_keep_every_word():
+    for seed in range(20):
+        text = memo(seed)
+        for max_chars in (40, 120, 500):
+            chunks = split_text(text, max_chars)
+            assert all(0 < len(chunk) <= max_chars for chunk in chunks)
+            assert " ".join(chunks).split() == text.split()
+
+def test_paragraphs_are_kept_whole_when_they_fit():
+    text = "First paragraph here.\n\nSecond one.\n\nThird."
+    assert split_text(text, 25) == ["First paragraph here.", "Second one.\n\nThird."]
+
+def test_short_text_is_one_chunk():
+    assert split_text("  Just one line.  ", 100) == ["Just one line."]
+    assert split_text("No limit at all.", 0) == ["No limit at all."]
+
+def test_oversized_word_is_cut_into_pieces():
+    word = "x" * 25
+    chunks = split_text(f"Start {word} end.", 10)
+    assert all(len(chunk) <= 10 for chunk in chunks)
+    assert "".join("".join(chunks).split()) == f"Start{word}end."
+    assert chunks == ["Start", "xxxxxxxxxx", "xxxxxxxxxx", "xxxxx end."]
+
+def test_empty_input():
+    assert split_text("", 10) == [""]
+    assert split_text(" \n\n ", 10) == [""]
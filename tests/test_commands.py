@@ -0,0 +1,46 @@
+import commands
+from commands import COMMANDS, Translation, parse_command, parse_input, regeneration
+from state_store import state_store
+
+def button_body(action_id, value):
+    return {"user": {"id": "U1"}, "channel": {"id": "C1"}, "team": {"id": "T1"}, "actions": [{"action_id": action_id, "value": value}]}
+
+def test_parse_command_strips_and_picks_modes():
+    assert parse_command("/tldr", "  hello  ") == ("hello", ["casual"])
+    assert parse_command("/tldr", "   ") == ("", ["casual"])
+    assert parse_command("/decode", "--all hello") == ("hello", COMMANDS["/decode"]["all_modes"])
+    assert parse_command("/decode", "--all") == ("", COMMANDS["/decode"]["all_modes"])
+    assert parse_command("/decode", "--all\nhello") == ("hello", COMMANDS["/decode"]["all_modes"])
+    assert parse_command("/decode", "--allow me to explain") == ("--allow me to explain", COMMANDS["/decode"]["modes"])
+    assert parse_command("/tldr", "--all hello") == ("--all hello", ["casual"])
+
+def test_parse_input_separates_links_from_text():
+    assert parse_input(" plain text ") == ("plain text", None)
+    assert parse_input("https://acme.slack.com/archives/C1/p1700000000000100") == (None, [("C1", "1700000000.000100", None)])
+    assert parse_input("https://acme.slack.com/archives/") == (None, [])
+
+def test_translation_stores_its_job_when_it_starts():
+    translation = Translation("C1", "Loading...", "hello", "casual", "Header", "Boss's Message", "U1")
+    assert translation.job_id is None
+
+    loading = translation.loading()
+    assert loading["channel"] == "C1"
+    assert state_store.get_job(translation.job_id)["input"] == "hello"
+
+    translation.ts = "1.0"
+    final = translation.final("hi there")
+    assert final["ts"] == "1.0"
+    assert state_store.get_job(translation.job_id)["history"] == ["hi there"]
+
+def test_streamed_updates_give_way_when_chat_update_budget_is_low(monkeypatch):
+    translation = Translation("C1", "Loading...", "hello", "casual", "Header", "Boss's Message", "U1")
+    translation.loading()
+    monkeypatch.setattr(commands.slack_limiter, "remaining", lambda method, channel=None: 0)
+    assert translation.streaming("partial") is None
+
+def test_regeneration_reuses_the_job():
+    job_id = state_store.create_job("hello", "email", user_id="U1", channel_id="C1", history=["Dear boss"])
+    translation = regeneration(button_body("regenerate_email", f"{job_id}:0"), "email")
+    assert translation.job_id == job_id
+    assert translation.mode == "email"
+    assert regeneration(button_body("regenerate_message", "j_AAAAAAAAAAAA:0")) is None
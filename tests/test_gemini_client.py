@@ -0,0 +1,68 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import gemini_client
+from fake_gemini import FakeGeminiClient
+from router import gemini_backend, gemini_async_backend
+from translator import build_prompt
+
+def install_fake(monkeypatch, **kwargs):
+    builds = []
+
+    def build_client():
+        builds.append(FakeGeminiClient(**kwargs))
+        return builds[-1]
+
+    monkeypatch.setattr(gemini_client, "build_client", build_client)
+    gemini_client.reset_client()
+    return builds
+
+def test_concurrent_calls_build_one_client(monkeypatch):
+    builds = install_fake(monkeypatch, chunk_delay=0.01)
+    before = gemini_client.client_builds
+    contents, config = build_prompt("Gimme a raise", 100)
+
+    def call(_):
+        return "".join(gemini_backend("model", contents, config))
+
+    try:
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(call, range(8)))
+        assert results == ["Synergy achieved."] * 8
+        assert gemini_client.client_builds - before == 1
+        assert len(builds) == 1 and len(builds[0].calls) == 8
+
+        # Later calls reuse the pooled connections instead of opening new ones
+        pool = builds[0].pool
+        opened = pool.opened
+        for i in range(4):
+            call(i)
+        assert pool.opened == opened
+        assert pool.reused >= 4
+    finally:
+        gemini_client.reset_client()
+
+def test_async_calls_share_the_client(monkeypatch):
+    builds = install_fake(monkeypatch)
+    contents, config = build_prompt("Gimme a raise", 100)
+
+    async def call():
+        return "".join([text async for text in gemini_async_backend("model", contents, config)])
+
+    async def main():
+        return await asyncio.gather(*(call() for _ in range(5)))
+
+    try:
+        assert asyncio.run(main()) == ["Synergy achieved."] * 5
+        assert len(builds) == 1 and len(builds[0].calls) == 5
+    finally:
+        gemini_client.reset_client()
+
+def test_set_client_replaces_the_shared_client():
+    fake = FakeGeminiClient(response="Per my last email.")
+    gemini_client.set_client(fake)
+    try:
+        contents, config = build_prompt("hello", 100)
+        assert "".join(gemini_backend("model", contents, config)) == "Per my last email."
+        assert gemini_client.get_client() is fake
+    finally:
+        gemini_client.reset_client()
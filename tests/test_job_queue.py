@@ -0,0 +1,80 @@
+import asyncio
+import threading
+import pytest
+from job_queue import JobQueue, AsyncJobQueue, QueueFull
+
+def test_runs_jobs_and_drains():
+    queue = JobQueue(workers=2)
+    done = []
+    for i in range(5):
+        queue.submit(lambda i=i: done.append(i), f"U{i}")
+    assert queue.drain(5)
+    assert sorted(done) == list(range(5))
+
+def test_rejects_jobs_beyond_max_depth():
+    release = threading.Event()
+    queue = JobQueue(workers=1, max_depth=1)
+    assert queue.submit(release.wait, "U1") == 0
+    # The first job may still be waiting for the worker to pick it up
+    for i in range(2):
+        try:
+            queue.submit(release.wait, f"U{i + 2}")
+        except QueueFull:
+            break
+    else:
+        pytest.fail("queue accepted more jobs than max_depth")
+    release.set()
+    assert queue.drain(5)
+
+def test_limits_running_jobs_per_user():
+    release = threading.Event()
+    started = []
+    lock = threading.Lock()
+
+    def job(user):
+        with lock:
+            started.append(user)
+        release.wait()
+
+    queue = JobQueue(workers=4, per_user=1)
+    queue.submit(lambda: job("U1"), "U1")
+    position = queue.submit(lambda: job("U1"), "U1")
+    queue.submit(lambda: job("U2"), "U2")
+    assert position > 0
+
+    for _ in range(100):
+        if len(started) == 2:
+            break
+        threading.Event().wait(0.01)
+    assert sorted(started) == ["U1", "U2"]
+
+    release.set()
+    assert queue.drain(5)
+    assert started.count("U1") == 2
+
+def test_draining_queue_refuses_new_jobs():
+    queue = JobQueue(workers=1)
+    assert queue.drain(1)
+    with pytest.raises(QueueFull):
+        queue.submit(lambda: None, "U1")
+
+def test_async_queue_runs_coroutines():
+    async def run():
+        queue = AsyncJobQueue(workers=2)
+        done = []
+
+        async def job(i):
+            await asyncio.sleep(0)
+            done.append(i)
+
+        for i in range(4):
+            await queue.submit(lambda i=i: job(i), f"U{i}")
+        for _ in range(100):
+            if len(done) == 4:
+                break
+            await asyncio.sleep(0.01)
+        for task in queue.tasks:
+            task.cancel()
+        return sorted(done)
+
+    assert asyncio.run(run()) == [0, 1, 2, 3]
@@ -0,0 +1,57 @@
+import asyncio
+from link_resolver import LinkResolver
+
+class FakeClient:
+    def __init__(self, history=(), replies=()):
+        self.history = list(history)
+        self.replies = list(replies)
+        self.calls = []
+
+    def conversations_history(self, **params):
+        self.calls.append(("history", params))
+        return {"messages": self.history}
+
+    def conversations_replies(self, **params):
+        self.calls.append(("replies", params))
+        return {"messages": self.replies}
+
+class AsyncFakeClient(FakeClient):
+    async def conversations_history(self, **params):
+        return FakeClient.conversations_history(self, **params)
+
+    async def conversations_replies(self, **params):
+        return FakeClient.conversations_replies(self, **params)
+
+def test_fetches_channel_message():
+    client = FakeClient(history=[{"ts": "1.000", "text": "hello"}])
+    assert LinkResolver().fetch(client, "C1", "1.000") == "hello"
+
+def test_deleted_message_does_not_resolve_to_the_one_before():
+    client = FakeClient(history=[{"ts": "0.500", "text": "an older message"}])
+    assert LinkResolver().fetch(client, "C1", "1.000") is None
+
+def test_reply_link_resolves_to_the_reply_not_the_parent():
+    client = FakeClient(replies=[{"ts": "1.000", "text": "parent"}, {"ts": "2.000", "text": "reply"}])
+    assert LinkResolver().fetch(client, "C1", "2.000", thread_ts="1.000") == "reply"
+    source, params = client.calls[0]
+    assert source == "replies"
+    assert params["limit"] >= 2
+
+def test_reply_link_with_only_the_parent_is_missing():
+    client = FakeClient(replies=[{"ts": "1.000", "text": "parent"}])
+    assert LinkResolver().fetch(client, "C1", "2.000", thread_ts="1.000") is None
+
+def test_results_are_cached_until_the_message_changes():
+    client = FakeClient(history=[{"ts": "1.000", "text": "hello"}])
+    resolver = LinkResolver()
+    resolver.fetch(client, "C1", "1.000")
+    resolver.fetch(client, "C1", "1.000")
+    assert len(client.calls) == 1
+
+    resolver.handle_event({"channel": "C1", "subtype": "message_changed", "message": {"ts": "1.000"}})
+    resolver.fetch(client, "C1", "1.000")
+    assert len(client.calls) == 2
+
+def test_async_reply_link_resolves_to_the_reply():
+    client = AsyncFakeClient(replies=[{"ts": "1.000", "text": "parent"}, {"ts": "2.000", "text": "reply"}])
+    assert asyncio.run(LinkResolver().aresolve(client, [("C1", "2.000", "1.000")])) == "reply"
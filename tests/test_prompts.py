@@ -0,0 +1,24 @@
+import json
+from prompts import PromptMode, PromptRegistry, DEFAULT_MODES
+
+def test_key_changes_with_the_template_and_generation_config():
+    mode = PromptMode("real", 2, "Be blunt: {user_input}")
+    assert PromptMode("real", 2, "Be blunt: {user_input}").key == mode.key
+    assert PromptMode("real", 2, "Be honest: {user_input}").key != mode.key
+    assert PromptMode("real", 2, "Be blunt: {user_input}", model="other-model").key != mode.key
+    assert PromptMode("real", 2, "Be blunt: {user_input}", max_output_tokens=300).key != mode.key
+    assert PromptMode("real", 2, "Be blunt: {user_input}", version="2").key != mode.key
+
+def test_reloaded_template_gets_a_new_key_without_a_version_bump(tmp_path):
+    path = tmp_path / "prompts.json"
+    path.write_text(json.dumps({"real": {"template": "Be blunt: {user_input}"}}))
+    registry = PromptRegistry(DEFAULT_MODES, path=str(path), reload_interval=0)
+    before = registry.get("real")
+    assert before.render("hi") == "Be blunt: hi"
+
+    path.write_text(json.dumps({"real": {"template": "Be brutal: {user_input}"}}))
+    registry.loaded_mtime = None
+    after = registry.get("real")
+    assert after.render("hi") == "Be brutal: hi"
+    assert after.version == before.version
+    assert after.key != before.key
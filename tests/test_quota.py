@@ -0,0 +1,29 @@
+import pytest
+from quota import UsageStore, QuotaLimiter, QuotaExceeded
+
+def test_usage_db_is_only_created_when_usage_is_written(tmp_path):
+    path = tmp_path / "usage.db"
+    store = UsageStore(str(path))
+    store.flush()
+    assert not path.exists()
+
+    store.record("user", "U1", requests=1, tokens=10)
+    store.flush()
+    assert path.exists()
+    assert store.usage("user", "U1") == {"requests": 1, "tokens": 10, "rejected": 0}
+
+def test_charge_rejects_over_budget():
+    quota = QuotaLimiter(UsageStore(""), budgets={("user", "requests"): (2, 60)})
+    quota.charge("U1", "C1", "T1", 0)
+    quota.charge("U1", "C1", "T1", 0)
+    with pytest.raises(QuotaExceeded):
+        quota.charge("U1", "C1", "T1", 0)
+    quota.charge("U2", "C1", "T1", 0)
+
+def test_refund_gives_the_charge_back():
+    usage = UsageStore("")
+    quota = QuotaLimiter(usage, budgets={("user", "requests"): (1, 60), ("user", "tokens"): (100, 3600)})
+    quota.charge("U1", "C1", "T1", 80)
+    quota.refund("U1", "C1", "T1", 80)
+    quota.charge("U1", "C1", "T1", 80)
+    assert usage.usage("user", "U1") == {"requests": 1, "tokens": 80, "rejected": 0}
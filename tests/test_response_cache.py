@@ -0,0 +1,24 @@
+from response_cache import ResponseCache, cache_lookups, cache_removals, cache_entries
+
+def test_lookups_and_evictions_are_exported_as_metrics():
+    cache = ResponseCache(max_entries=2, ttl=3600)
+    hits, misses, evicted = cache_lookups.value(result="hit"), cache_lookups.value(result="miss"), cache_removals.value(reason="evicted")
+
+    cache.set("a", "1")
+    cache.set("b", "2")
+    cache.set("c", "3")
+    assert cache.get("a") is None
+    assert cache.get("c") == "3"
+
+    assert cache_lookups.value(result="hit") == hits + 1
+    assert cache_lookups.value(result="miss") == misses + 1
+    assert cache_removals.value(reason="evicted") == evicted + 1
+    assert cache_entries.value() == 2
+
+def test_disk_hits_survive_a_restart(tmp_path):
+    path = str(tmp_path / "cache.db")
+    ResponseCache(db_path=path).set("a", "1")
+    disk_hits = cache_lookups.value(result="disk_hit")
+
+    assert ResponseCache(db_path=path).get("a") == "1"
+    assert cache_lookups.value(result="disk_hit") == disk_hits + 1
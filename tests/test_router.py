@@ -0,0 +1,91 @@
+import asyncio
+import time
+from resilience import CircuitBreaker, CLOSED, OPEN, HALF_OPEN
+from router import Router
+
+def open_breaker(breaker):
+    breaker.state = OPEN
+    breaker.opened_at = time.monotonic() - breaker.reset_timeout
+
+def slow_primary(model, contents, config):
+    if model == "primary":
+        time.sleep(0.3)
+    yield f"{model}: {contents}"
+
+async def async_slow_primary(model, contents, config):
+    if model == "primary":
+        await asyncio.sleep(0.3)
+    yield f"{model}: {contents}"
+
+def failing_primary(model, contents, config):
+    if model == "primary":
+        raise ValueError("primary is down")
+    yield f"{model}: {contents}"
+
+def test_breaker_opens_after_threshold():
+    breaker = CircuitBreaker("model", failure_threshold=2, reset_timeout=60)
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    assert not breaker.allow()
+
+def test_half_open_allows_one_trial():
+    breaker = CircuitBreaker("model", failure_threshold=1, reset_timeout=60)
+    open_breaker(breaker)
+    assert breaker.allow()
+    assert breaker.state == HALF_OPEN
+    assert not breaker.allow()
+
+    breaker.record_success()
+    assert breaker.state == CLOSED
+    assert breaker.allow()
+
+def test_failed_trial_reopens():
+    breaker = CircuitBreaker("model", failure_threshold=5, reset_timeout=60)
+    open_breaker(breaker)
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    assert not breaker.allow()
+
+def test_released_trial_lets_the_next_call_try():
+    breaker = CircuitBreaker("model", failure_threshold=1, reset_timeout=60)
+    open_breaker(breaker)
+    assert breaker.allow()
+    breaker.release_trial()
+    assert breaker.allow()
+
+def test_falls_back_to_next_model_on_error():
+    router = Router(backend=failing_primary, hedging=False)
+    assert list(router.stream("test", ["primary", "backup"], "hi", None)) == ["backup: hi"]
+    assert router.stats_for("primary").error_rate() == 1.0
+
+def test_hedge_wins_when_primary_is_slow():
+    router = Router(backend=slow_primary, hedging=True, hedge_after=0.05)
+    assert list(router.stream("test", ["primary", "backup"], "hi", None)) == ["backup: hi"]
+
+def test_cancelled_half_open_trial_is_released():
+    router = Router(backend=slow_primary, hedging=True, hedge_after=0.05)
+    breaker = router.breaker_for("primary")
+    open_breaker(breaker)
+
+    assert list(router.stream("test", ["primary", "backup"], "hi", None)) == ["backup: hi"]
+    # The losing trial notices it was cancelled once its first chunk arrives
+    time.sleep(0.5)
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow()
+
+def test_async_cancelled_half_open_trial_is_released():
+    router = Router(async_backend=async_slow_primary, hedging=True, hedge_after=0.05)
+    breaker = router.breaker_for("primary")
+    open_breaker(breaker)
+
+    async def run():
+        chunks = [chunk async for chunk in router.astream("test", ["primary", "backup"], "hi", None)]
+        await asyncio.sleep(0)
+        return chunks
+
+    assert asyncio.run(run()) == ["backup: hi"]
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow()
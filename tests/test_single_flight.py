@@ -0,0 +1,72 @@
+import asyncio
+import threading
+from single_flight import SingleFlight, AsyncSingleFlight
+
+def test_followers_share_one_generation():
+    gate = threading.Event()
+    calls = []
+
+    def produce():
+        calls.append(1)
+        gate.wait()
+        yield "a"
+        yield "b"
+
+    flights = SingleFlight()
+    first, joined_first = flights.join("key", produce)
+    second, joined_second = flights.join("key", produce)
+    gate.set()
+
+    assert (joined_first, joined_second) == (False, True)
+    assert first is second
+    assert list(first.follow()) == ["a", "b"]
+    assert list(second.follow()) == ["a", "b"]
+    assert len(calls) == 1
+
+def test_errors_reach_every_follower():
+    def produce():
+        yield "a"
+        raise ValueError("boom")
+
+    flight, joined = SingleFlight().join("key", produce)
+    chunks = []
+    try:
+        for text in flight.follow():
+            chunks.append(text)
+    except ValueError as e:
+        assert str(e) == "boom"
+    else:
+        raise AssertionError("the error was swallowed")
+    assert chunks == ["a"]
+
+def test_finished_flights_are_forgotten():
+    flights = SingleFlight()
+    flight, joined = flights.join("key", lambda: iter(["a"]))
+    assert list(flight.follow()) == ["a"]
+    again, joined = flights.join("key", lambda: iter(["b"]))
+    assert not joined
+    assert list(again.follow()) == ["b"]
+
+def test_async_followers_share_one_generation():
+    calls = []
+
+    async def produce():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        yield "a"
+        yield "b"
+
+    async def run():
+        flights = AsyncSingleFlight()
+        first, joined_first = flights.join("key", produce)
+        second, joined_second = flights.join("key", produce)
+        results = await asyncio.gather(collect(first), collect(second))
+        return joined_first, joined_second, results
+
+    async def collect(flight):
+        return [text async for text in flight.follow()]
+
+    joined_first, joined_second, results = asyncio.run(run())
+    assert (joined_first, joined_second) == (False, True)
+    assert results == [["a", "b"], ["a", "b"]]
+    assert len(calls) == 1
@@ -0,0 +1,83 @@
+import threading
+import time
+import pytest
+from slack_sdk.errors import SlackApiError
+import slack_client
+from slack_client import SlackRateLimiter, build_client, SLACK_RATE_LIMIT_RETRIES
+from benchmarks.fake_servers import FakeSlackServer
+
+@pytest.fixture
+def server():
+    server = FakeSlackServer().start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+@pytest.fixture
+def limiter(monkeypatch):
+    # 600 calls a minute for chat.update, so an emptied budget refills within a tenth of a second
+    limiter = SlackRateLimiter(scale=12)
+    monkeypatch.setattr(slack_client, "slack_limiter", limiter)
+    return limiter
+
+def client_for(server):
+    client = build_client(token="xoxb-test")
+    client.base_url = server.url
+    return client
+
+def test_calls_reuse_one_pooled_connection(server, limiter):
+    client = client_for(server)
+    slack_client.reset_pool()
+    for i in range(5):
+        assert client.chat_update(channel="C1", ts="1.0", text=f"update {i}")["ok"]
+    assert len(server.calls_for("chat.update")) == 5
+    connection_pool = slack_client.pool.connection_from_url(server.url)
+    assert connection_pool.num_connections == 1
+
+def test_rate_limited_call_is_retried_then_raises(server, limiter):
+    server.rate_limit_rate = 1.0
+    server.retry_after = 1
+    client = client_for(server)
+
+    started = time.monotonic()
+    with pytest.raises(SlackApiError) as raised:
+        client.chat_update(channel="C1", ts="1.0", text="hi")
+    assert raised.value.response.status_code == 429
+    assert raised.value.response["error"] == "ratelimited"
+    assert len(server.rate_limited) == SLACK_RATE_LIMIT_RETRIES + 1
+    assert time.monotonic() - started >= SLACK_RATE_LIMIT_RETRIES
+    # Everyone else calling the method was held back for the Retry-After too
+    assert limiter.bucket("chat.update").paused_until >= started + 1
+
+def test_retry_after_a_rate_limit_succeeds(server, limiter):
+    server.rate_limit_rate = 1.0
+    server.retry_after = 1
+    client = client_for(server)
+
+    # The first attempt gets the 429, the retry a second later goes through
+    timer = threading.Timer(0.5, setattr, (server, "rate_limit_rate", 0))
+    timer.start()
+    started = time.monotonic()
+    assert client.chat_update(channel="C1", ts="1.0", text="hi")["ok"]
+    timer.join()
+    assert time.monotonic() - started >= 1
+    assert len(server.rate_limited) == 1
+    assert len(server.calls_for("chat.update")) == 1
+
+def test_server_errors_surface_as_api_errors(server, limiter):
+    server.error_rate = 1.0
+    client = client_for(server)
+    with pytest.raises(SlackApiError) as raised:
+        client.chat_update(channel="C1", ts="1.0", text="hi")
+    assert raised.value.response.status_code == 500
+    assert raised.value.response["error"] == "fatal_error"
+
+def test_calls_wait_for_rate_limit_budget(server, limiter):
+    client = client_for(server)
+    bucket = limiter.bucket("chat.update")
+    while bucket.try_acquire():
+        pass
+
+    started = time.monotonic()
+    assert client.chat_update(channel="C1", ts="1.0", text="hi")["ok"]
+    assert time.monotonic() - started >= 0.08
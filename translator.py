@@ -1,91 +1,193 @@
+import asyncio
 import base64
 import os
-from google import genai
-from google.genai import types
+from concurrent.futures import ThreadPoolExecutor
+from response_cache import response_cache, make_key
+from prompts import get_mode
+from router import router
+from single_flight import SingleFlight, AsyncSingleFlight
+import metrics
 
-def generate(user_input, index):
+FANOUT_WORKERS = int(os.environ.get("FANOUT_WORKERS", 16))
+
+fanout_executor = ThreadPoolExecutor(max_workers=FANOUT_WORKERS, thread_name_prefix="translator-fanout")
+
+generations = metrics.counter("translator_generations_total", "generate calls by prompt mode and whether the cache, the model or an identical in-flight call answered them")
+chunked_inputs = metrics.counter("translator_chunked_inputs_total", "Long inputs split into chunks and merged with a reduce pass, by mode")
+input_chunks = metrics.counter("translator_input_chunks_total", "Chunks translated for long inputs, by mode")
+coalesced = metrics.counter("translator_coalesced_requests_total", "Generations that joined an identical one already in flight instead of calling the model, by mode")
+
+flights = SingleFlight()
+async_flights = AsyncSingleFlight()
+
+def build_request(user_input, mode):
+    prompt_mode = get_mode(mode)
+    return build_prompt(prompt_mode.render(user_input), prompt_mode.max_output_tokens)
+
+def build_prompt(prompt, max_output_tokens):
+    from google.genai import types
+
+    contents = [
+        types.Content(
+            role="user",
+            parts=[
+                types.Part.from_text(text=prompt),
+            ],
+        ),
+    ]
+    generate_content_config = types.GenerateContentConfig(
+        max_output_tokens=max_output_tokens,
+        response_mime_type="text/plain",
+    )
+
+    return contents, generate_content_config
+
+def generate(user_input, mode, use_cache=True):
+    return "".join(generate_stream(user_input, mode, use_cache=use_cache))
+
+def generate_stream(user_input, mode, use_cache=True):
+    prompt_mode = get_mode(mode)
+    cache_key = make_key(prompt_mode.key, user_input, prompt_mode.model)
+    if use_cache:
+        cached = response_cache.get(cache_key)
+        if cached is not None:
+            generations.inc(mode=prompt_mode.name, source="cache")
+            yield cached
+            return
+
+        # Identical requests share one generation; regenerations (use_cache=False) want a fresh one
+        flight, joined = flights.join(cache_key, lambda: stream_model(user_input, prompt_mode, cache_key))
+        count_generation(prompt_mode, joined)
+        yield from flight.follow()
+        return
+
+    count_generation(prompt_mode, False)
+    yield from stream_model(user_input, prompt_mode, cache_key)
+
+def count_generation(prompt_mode, joined):
+    if joined:
+        coalesced.inc(mode=prompt_mode.name)
+    generations.inc(mode=prompt_mode.name, source="coalesced" if joined else "model")
+
+def map_chunks(chunks, prompt_mode):
+    chunked_inputs.inc(mode=prompt_mode.name)
+    input_chunks.inc(len(chunks), mode=prompt_mode.name)
+
+    def translate_chunk(chunk):
+        contents, config = build_prompt(prompt_mode.render(chunk), prompt_mode.chunk_max_output_tokens)
+        return "".join(router.stream(prompt_mode.name, prompt_mode.models, contents, config))
+
+    # A pool per input keeps chunk_parallelism per request and can't starve fanout_executor
+    with ThreadPoolExecutor(max_workers=min(prompt_mode.chunk_parallelism, len(chunks)), thread_name_prefix="translator-chunk") as executor:
+        parts = list(executor.map(translate_chunk, chunks))
+    return build_prompt(prompt_mode.render_reduce(parts), prompt_mode.reduce_max_output_tokens)
+
+async def amap_chunks(chunks, prompt_mode):
+    chunked_inputs.inc(mode=prompt_mode.name)
+    input_chunks.inc(len(chunks), mode=prompt_mode.name)
+    semaphore = asyncio.Semaphore(prompt_mode.chunk_parallelism)
+
+    async def translate_chunk(chunk):
+        async with semaphore:
+            contents, config = build_prompt(prompt_mode.render(chunk), prompt_mode.chunk_max_output_tokens)
+            return "".join([text async for text in router.astream(prompt_mode.name, prompt_mode.models, contents, config)])
+
+    parts = await asyncio.gather(*(translate_chunk(chunk) for chunk in chunks))
+    return build_prompt(prompt_mode.render_reduce(parts), prompt_mode.reduce_max_output_tokens)
+
+def stream_model(user_input, prompt_mode, cache_key):
     try:
-        api_key = os.environ.get("GEMINI_API_KEY")
-        if not api_key:
-            raise Exception("GEMINI_API_KEY environment variable is not set")
-        
-        client = genai.Client(api_key=api_key)
-        model = "gemini-2.0-flash-lite"
-
-        corporate_prompt = f"""
-Take this simple, first-person statement and rewrite it as an overly formal, verbose, and absurdly inflated corporate message spoken from the "I" perspective. 
-Use excessive business jargon and buzzwords like "strategic alignment," "synergy," "value-add," "ideation bandwidth," and "paradigm shifts." 
-Maintain the original meaning and the use of "I" pronouns, parodying the style of executives but keeping it first-person singular. 
-Only output the transformed sentence, no explanations or formatting.
-
-Original: {user_input}
-"""
-
-        casual_prompt = f"""
-Rewrite the following overly formal, jargon‑heavy corporate message (spoken from the "we" perspective) into a longer, plain‑English statement—about 25-40 words—from the same "we" point of view.
-
-• Strip out buzzwords such as "strategic alignment," "synergy," "value‑add," "ideation bandwidth," and "paradigms."  
-• Preserve the core meaning and keep the pronoun "we."  
-• Output only the rewritten text—no extra commentary or formatting.
-
-Original: {user_input}
-"""
-
-        real_prompt = f"""
-Take the following overly formal, jargon-filled corporate message and translate it into what the company is really trying to say. Here is the messsage: {user_input}. Strip away all business buzzwords, vague language, and PR spin. 
-Be blunt, honest, realistic and cynical — but stay true to the actual meaning and tone. 
-Focus on what leadership is *actually* saying or implying, especially if it's about making money or greed, pushing work onto employees unfairly or suggesting unpaid overtime, or protecting the company's image while disregarding the ethics. Make it all about the company so that it paints them as someone who is selfish.
-Keep it short and direct. Only output the real meaning — no explanations or formatting.
-"""
-        
-        email_prompt = f"""
-Convert the following response into an email format
-• Output only the rewritten text—no extra commentary or formatting.
-Response: {user_input}
-"""
-
-        if index == 0:
-            prompt = corporate_prompt
-        elif index == 1:
-            prompt = casual_prompt
-        elif index == 2:
-            prompt = real_prompt
-        elif index == 3:
-            prompt = email_prompt
+        # Long inputs: translate the chunks concurrently, then stream the pass that merges them
+        chunks = prompt_mode.chunks(user_input)
+        if len(chunks) > 1:
+            contents, generate_content_config = map_chunks(chunks, prompt_mode)
         else:
-            raise Exception(f"Invalid index: {index}")
-            
-        contents = [
-            types.Content(
-                role="user",
-                parts=[
-                    types.Part.from_text(text=prompt),
-                ],
-            ),
-        ]
-        generate_content_config = types.GenerateContentConfig(
-            max_output_tokens=150,
-            response_mime_type="text/plain",
-        )
+            contents, generate_content_config = build_request(user_input, prompt_mode)
 
         result = ""
-        for chunk in client.models.generate_content_stream(
-            model=model,
-            contents=contents,
-            config=generate_content_config,
-        ):
-            result += chunk.text
-        
+        for text in router.stream(prompt_mode.name, prompt_mode.models, contents, generate_content_config):
+            result += text
+            yield text
+
         if not result or result.strip() == "":
             raise Exception("AI generated an empty response")
-            
-        return result
+
+        response_cache.set(cache_key, result)
         
     except Exception as e:
         print(f"Error in generate function: {str(e)}")
         raise e
 
+def generate_many(user_input, modes, use_cache=True):
+    futures = {mode: fanout_executor.submit(generate, user_input, mode, use_cache) for mode in modes}
+    results = {}
+    for mode, future in futures.items():
+        try:
+            results[mode] = future.result()
+        except Exception:
+            results[mode] = None
+
+    if all(response is None for response in results.values()):
+        raise Exception("AI failed to generate any of the requested modes")
+    return results
+
+async def agenerate_many(user_input, modes, use_cache=True):
+    responses = await asyncio.gather(*(agenerate(user_input, mode, use_cache) for mode in modes), return_exceptions=True)
+    results = {mode: (None if isinstance(response, Exception) else response) for mode, response in zip(modes, responses)}
+
+    if all(response is None for response in results.values()):
+        raise Exception("AI failed to generate any of the requested modes")
+    return results
+
+async def agenerate(user_input, mode, use_cache=True):
+    result = ""
+    async for chunk in agenerate_stream(user_input, mode, use_cache=use_cache):
+        result += chunk
+    return result
+
+async def agenerate_stream(user_input, mode, use_cache=True):
+    prompt_mode = get_mode(mode)
+    cache_key = make_key(prompt_mode.key, user_input, prompt_mode.model)
+    if use_cache:
+        cached = response_cache.get(cache_key)
+        if cached is not None:
+            generations.inc(mode=prompt_mode.name, source="cache")
+            yield cached
+            return
+
+        flight, joined = async_flights.join(cache_key, lambda: astream_model(user_input, prompt_mode, cache_key))
+        count_generation(prompt_mode, joined)
+        async for text in flight.follow():
+            yield text
+        return
+
+    count_generation(prompt_mode, False)
+    async for text in astream_model(user_input, prompt_mode, cache_key):
+        yield text
+
+async def astream_model(user_input, prompt_mode, cache_key):
+    try:
+        chunks = prompt_mode.chunks(user_input)
+        if len(chunks) > 1:
+            contents, generate_content_config = await amap_chunks(chunks, prompt_mode)
+        else:
+            contents, generate_content_config = build_request(user_input, prompt_mode)
+
+        result = ""
+        async for text in router.astream(prompt_mode.name, prompt_mode.models, contents, generate_content_config):
+            result += text
+            yield text
+
+        if not result or result.strip() == "":
+            raise Exception("AI generated an empty response")
+
+        response_cache.set(cache_key, result)
+
+    except Exception as e:
+        print(f"Error in agenerate function: {str(e)}")
+        raise e
+
 if __name__ == "__main__":
     user_input = input("Input: ")
-    message = generate(user_input, 2)
+    message = generate(user_input, "real")
     print(message)
\ No newline at end of file